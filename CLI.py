@@ -1,2 +1,99 @@
-import models
-models.ask_user()
\ No newline at end of file
+import argparse
+import os
+import subprocess
+import sys
+
+
+# Budget for importing the analytic models in a fresh interpreter, in milliseconds
+IMPORT_BUDGET_MS = 20
+
+
+def measure_import(module="models", runs=5):
+    """Returns the best time in milliseconds of importing a module in a fresh interpreter."""
+    code = f"import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+    here = os.path.dirname(os.path.abspath(__file__))
+    times = [float(subprocess.run([sys.executable, "-c", code], cwd=here, capture_output=True,
+                                  text=True, check=True).stdout) for _ in range(runs)]
+    return min(times) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Queueing models and simulation.")
+    parser.add_argument("--profile", action="store_true", help="Print per-phase timings and counters to stderr.")
+    parser.add_argument("--trace", metavar="PATH",
+                        help="Also write the profile as a Chrome trace JSON file (implies --profile).")
+    subcommands = parser.add_subparsers(dest="command")
+
+    batch = subcommands.add_parser("batch", help="Evaluate scenarios from a file without any prompts or windows.")
+    batch.add_argument("scenarios", help="CSV, JSON or JSONL file with lambda, mu, c and K columns.")
+    batch.add_argument("-o", "--output", required=True, help="Results file: .csv, .jsonl or .npz (columnar).")
+    batch.add_argument("-n", "--simulate", type=int, default=0, metavar="CUSTOMERS",
+                       help="Also simulate each scenario with this many customers.")
+    batch.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes (default: CPU count).")
+    batch.add_argument("--seed", type=int, default=None, help="Root seed of the simulation streams.")
+
+    startup = subcommands.add_parser("startup", help="Check the import time of a module against its budget.")
+    startup.add_argument("--module", default="models", help="Module to import (default: models).")
+    startup.add_argument("--budget", type=float, default=IMPORT_BUDGET_MS, help="Budget in milliseconds.")
+
+    benchmark = subcommands.add_parser("benchmark", help="Time the simulation and models and check their accuracy.")
+    benchmark.add_argument("-o", "--output", help="Save the report to this JSON file.")
+    benchmark.add_argument("--sizes", type=lambda value: int(float(value)), nargs="+", metavar="CUSTOMERS",
+                           help="Customers per simulated run (default: 1e3 to 1e8).")
+    benchmark.add_argument("--servers", type=int, nargs="+", metavar="C",
+                           help="Server counts for the model timings (default: 1 to 1e4).")
+    benchmark.add_argument("--accuracy-customers", type=lambda value: int(float(value)), default=10 ** 6,
+                           help="Customers per run of the multi-server accuracy checks.")
+    benchmark.add_argument("--no-chart", action="store_true", help="Do not time chart.")
+    benchmark.add_argument("--compare", metavar="BASELINE",
+                           help="Compare with a saved report; exits with 1 on a regression over 20%%.")
+
+    args = parser.parse_args(argv)
+    profiled = args.profile or args.trace is not None
+    if profiled:
+        import profiling
+
+        profiling.enable(trace=args.trace is not None)
+    try:
+        run(args)
+    finally:
+        if profiled:
+            profile = profiling.disable()
+            profile.display(file=sys.stderr)
+            if args.trace is not None:
+                profile.chrome_trace(args.trace)
+
+
+def run(args):
+    """Runs the subcommand parsed from the command line."""
+    if args.command == "batch":
+        from batch import read_scenarios, run_batch, write_results
+
+        rows = run_batch(read_scenarios(args.scenarios), args.simulate, args.seed, args.jobs)
+        write_results(rows, args.output)
+        failed = sum(row["error"] is not None for row in rows)
+        print(f"Evaluated {len(rows)} scenarios ({failed} failed) into {args.output}", file=sys.stderr)
+    elif args.command == "benchmark":
+        import benchmark as bench
+
+        report = bench.run_benchmarks(args.sizes or bench.SIZES, args.servers or bench.SERVER_COUNTS,
+                                      args.accuracy_customers, not args.no_chart)
+        bench.display(report)
+        if args.output:
+            bench.save(report, args.output)
+        if args.compare:
+            print()
+            if bench.compare(bench.load(args.compare), report):
+                sys.exit(1)
+    elif args.command == "startup":
+        elapsed = measure_import(args.module)
+        print(f"import {args.module}: {elapsed:.1f} ms (budget {args.budget:g} ms)")
+        if elapsed > args.budget:
+            sys.exit(1)
+    else:
+        import models
+        models.ask_user()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,92 @@
 import tkinter as tk
 from tkinter import ttk, messagebox,Text, Entry, Button, Frame
-from simulation import simulate, chart
-from models import solution
-from contextlib import contextmanager
-import sys
+from simulation import simulate_single, performance_metrics, chart_timeline, SimulationCancelled
+from models import solve
+from report import TABLE_HEADERS, table_columns
+import threading
+import queue
 import io
 
-@contextmanager
-def capture_output():
-    new_out = io.StringIO()
-    old_out = sys.stdout
-    sys.stdout = new_out
-    try:
-        yield sys.stdout
-    finally:
-        sys.stdout = old_out
+# How often the main thread checks the worker's message queue, in milliseconds
+POLL_INTERVAL_MS = 50
+
+# Number of progress steps of a simulation; progress and cancel are checked once per step
+PROGRESS_STEPS = 100
+
+# Messages from the worker thread: ("progress", fraction), ("done", (text, result, timeline)),
+# ("cancelled", None) or ("error", exception)
+messages = queue.Queue()
+cancel_event = threading.Event()
+
+
+class VirtualTable(Frame):
+    """
+    Shows the rows of a large table by rendering only the rows that fit in the window.
+    The rows are read from NumPy columns when they scroll into view, so the cost of
+    showing a result does not depend on the number of customers.
+    """
+
+    ROW_HEIGHT = 20
+
+    def __init__(self, master, headers):
+        super().__init__(master)
+        self.columns = []
+        self.top = 0
+        self.visible = 1
+
+        ttk.Style().configure("Virtual.Treeview", rowheight=self.ROW_HEIGHT)
+        self.tree = ttk.Treeview(self, columns=headers, show="headings", selectmode="none",
+                                 style="Virtual.Treeview")
+        for header in headers:
+            self.tree.heading(header, text=header)
+            self.tree.column(header, width=100, anchor="e")
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.on_scroll)
+
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+
+        self.tree.bind("<Configure>", self.on_resize)
+        self.tree.bind("<MouseWheel>", lambda event: self.scroll_to(self.top - event.delta // 120 * 3))
+        self.tree.bind("<Button-4>", lambda event: self.scroll_to(self.top - 3))
+        self.tree.bind("<Button-5>", lambda event: self.scroll_to(self.top + 3))
+
+    def __len__(self):
+        return len(self.columns[0]) if self.columns else 0
+
+    def set_columns(self, columns):
+        """Shows new columns (equal-length arrays) from the first row."""
+        self.columns = columns
+        self.scroll_to(0)
+
+    def on_resize(self, event):
+        # One row's worth of height is taken by the headings
+        self.visible = max(1, event.height // self.ROW_HEIGHT - 1)
+        self.refresh()
+
+    def on_scroll(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * len(self)))
+        else:
+            self.scroll_to(self.top + int(amount) * (self.visible if unit == "pages" else 1))
+
+    def scroll_to(self, top):
+        self.top = max(0, min(top, len(self) - self.visible))
+        self.refresh()
+
+    def refresh(self):
+        """Replaces the rendered rows with the rows currently in view."""
+        self.tree.delete(*self.tree.get_children())
+        stop = min(self.top + self.visible, len(self))
+        for i in range(self.top, stop):
+            row = [column[i] for column in self.columns]
+            self.tree.insert("", tk.END, values=[int(row[0])] + [f"{value:.4f}" for value in row[1:]])
+        if len(self):
+            self.scrollbar.set(self.top / len(self), stop / len(self))
+        else:
+            self.scrollbar.set(0, 1)
+
 
 def display_output(output):
     """Displays simulation outputs in the GUI."""
@@ -22,26 +94,94 @@ def display_output(output):
     text_output.insert(tk.END, output)
     text_output.insert(tk.END, "\n"+100*"="+"\n")
     text_output.configure(state="disabled")
+    text_output.see(tk.END)
+
+def read_inputs():
+    # Retrieve inputs
+    arrival_rate = float(entry_arrival_rate.get())
+    service_rate = float(entry_service_rate.get())
+    num_servers = int(entry_num_servers.get())
+    capacity = entry_capacity.get()
+
+    if capacity.strip():
+        capacity = int(capacity)
+    else:
+        capacity = float('inf')
+    return arrival_rate, service_rate, num_servers, capacity
+
+def solution_task(arrival_rate, service_rate, num_servers, capacity):
+    output = io.StringIO()
+    solve(arrival_rate, service_rate, num_servers, capacity).display(output)
+    return output.getvalue(), None, None
+
+def simulation_task(arrival_rate, service_rate, num_customers):
+    result = simulate_single(arrival_rate, service_rate, num_customers, cancel=cancel_event,
+                             progress=lambda done, total: messages.put(("progress", done / total)),
+                             block_size=num_customers // PROGRESS_STEPS)
+    output = io.StringIO()
+    performance_metrics(result.time_in_queue, result.service_times, result.interarrival_times,
+                        result.time_in_system, output)
+    if cancel_event.is_set():
+        raise SimulationCancelled()
+    # The timeline is built here so that only the drawing runs on the Tk main thread
+    return output.getvalue(), result, chart_timeline(result)
+
+def worker(task, args):
+    """Runs a task on the worker thread and posts its outcome to the message queue."""
+    try:
+        messages.put(("done", task(*args)))
+    except SimulationCancelled:
+        messages.put(("cancelled", None))
+    except Exception as e:
+        messages.put(("error", e))
+
+def start(task, *args):
+    """Starts a task in the background; the window stays responsive while it runs."""
+    cancel_event.clear()
+    btn_run_solution.configure(state="disabled")
+    btn_run_simulation.configure(state="disabled")
+    btn_cancel.configure(state="normal")
+    progress_bar["value"] = 0
+    threading.Thread(target=worker, args=(task, args), daemon=True).start()
+    root.after(POLL_INTERVAL_MS, poll)
+
+def poll():
+    """Applies the worker's messages on the main thread until the task finishes."""
+    try:
+        while True:
+            kind, payload = messages.get_nowait()
+            if kind == "progress":
+                progress_bar["value"] = 100 * payload
+            else:
+                finish(kind, payload)
+                return
+    except queue.Empty:
+        root.after(POLL_INTERVAL_MS, poll)
+
+def finish(kind, payload):
+    btn_run_solution.configure(state="normal")
+    btn_run_simulation.configure(state="normal")
+    btn_cancel.configure(state="disabled")
+
+    if kind == "error":
+        progress_bar["value"] = 0
+        messagebox.showerror("Error", f"{str(payload)}")
+    elif kind == "cancelled":
+        progress_bar["value"] = 0
+        display_output("Simulation cancelled.")
+    else:
+        progress_bar["value"] = 100
+        output, result, timeline = payload
+        display_output(output)
+        if result is not None:
+            from plotting import plot_timeline
+
+            table.set_columns(table_columns(result))
+            plot_timeline(*timeline)
 
 def run_solution():
     try:
-        # Retrieve inputs
-        arrival_rate = float(entry_arrival_rate.get())
-        service_rate = float(entry_service_rate.get())
-        num_servers = int(entry_num_servers.get())
-        capacity = entry_capacity.get()
-        
-        if capacity.strip():
-            capacity = int(capacity)
-        else:
-            capacity = float('inf')
-
-        # Capture the solution output
-        with capture_output() as output:
-            solution(arrival_rate, service_rate, num_servers, capacity)
-        
-        # Display the captured output
-        display_output(output.getvalue())
+        start(solution_task, *read_inputs())
     except Exception as e:
         messagebox.showerror("Error", f"{str(e)}")
 
@@ -52,21 +192,13 @@ def run_simulation():
         service_rate = float(entry_service_rate.get())
         num_customers= int(entry_num_customers.get())
 
-        # Capture the simulation output
-        with capture_output() as output:
-            simulate(arrival_rate, service_rate,num_customers)
-
-        # Display the captured output
-        display_output(output.getvalue())
-            
-            
-            
-        chart()
-            
-        
+        start(simulation_task, arrival_rate, service_rate, num_customers)
     except Exception as e:
         messagebox.showerror("Error", f"{str(e)}")
 
+def cancel():
+    cancel_event.set()
+
 # Create the main window
 root = tk.Tk()
 root.title("Queueing System Simulator")
@@ -76,7 +208,8 @@ root.geometry("1200x800")  # Initial size
 root.columnconfigure(0, weight=1)
 root.rowconfigure(0, weight=2)  # Input frame with proportion
 root.rowconfigure(1, weight=0)  # Buttons frame (fixed)
-root.rowconfigure(2, weight=2)  # Output frame with more proportion
+root.rowconfigure(2, weight=1)  # Metrics output
+root.rowconfigure(3, weight=2)  # Per-customer table with more proportion
 
 # Input frame (Top)
 frame_inputs = Frame(root, padx=5, pady=5)
@@ -118,22 +251,24 @@ buttons_frame.columnconfigure(0, weight=1)
 
 # Add buttons to buttons_frame
 btn_run_solution = Button(buttons_frame, text="Run Solution", command=run_solution)
-btn_run_solution.grid(row=0, column=0, sticky="ew", pady=2)
+btn_run_solution.grid(row=0, column=0, columnspan=2, sticky="ew", pady=2)
 
 btn_run_simulation = Button(buttons_frame, text="Run Simulation", command=run_simulation)
-btn_run_simulation.grid(row=1, column=0, sticky="ew", pady=2)
+btn_run_simulation.grid(row=1, column=0, columnspan=2, sticky="ew", pady=2)
 
-# # Output frame (Bottom)
-# output_frame = Frame(root, padx=5, pady=5)
-# output_frame.grid(row=2, column=0, sticky="nsew")
+progress_bar = ttk.Progressbar(buttons_frame, mode="determinate", maximum=100)
+progress_bar.grid(row=2, column=0, sticky="ew", pady=2)
 
-# # Configure the output frame
-# output_frame.columnconfigure(0, weight=1)
-# output_frame.rowconfigure(0, weight=1)
+btn_cancel = Button(buttons_frame, text="Cancel", command=cancel, state="disabled")
+btn_cancel.grid(row=2, column=1, sticky="e", padx=5, pady=2)
 
 # Add text field to output_frame
 text_output = Text(root, wrap="word")
 text_output.grid(row=2, column=0, sticky="nsew")
 
+# Per-customer table of the last simulation
+table = VirtualTable(root, TABLE_HEADERS)
+table.grid(row=3, column=0, sticky="nsew")
+
 # Start the Tkinter event loop
-root.mainloop()
\ No newline at end of file
+root.mainloop()
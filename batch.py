@@ -0,0 +1,142 @@
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from math import inf, isnan
+
+import numpy as np
+
+from models import solve
+from simulation import simulate_multi
+
+
+# Accepted spellings of each scenario column.
+FIELDS = {
+    "lumbda": ("lumbda", "lambda", "arrival_rate"),
+    "mu": ("mu", "service_rate"),
+    "numberOfServers": ("numberOfServers", "c", "servers"),
+    "systemCapacity": ("systemCapacity", "K", "k", "capacity"),
+}
+
+MEASURES = ("L", "Lq", "W", "Wq", "Ru", "P0")
+SIMULATED = ("sim_W", "sim_Wq", "sim_L", "sim_Lq", "sim_Pb")
+
+
+def read_scenarios(path):
+    """Reads scenarios from a CSV, JSON (list of objects) or JSON Lines file.
+
+    Returns:
+        List[dict]: One dict per scenario with lumbda, mu, numberOfServers and
+        systemCapacity; a missing, empty or non-positive capacity means
+        unlimited, as in validate.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, newline="") as file:
+        if extension == ".csv":
+            records = list(csv.DictReader(file))
+        elif extension == ".json":
+            records = json.load(file)
+        elif extension == ".jsonl":
+            records = [json.loads(line) for line in file if line.strip()]
+        else:
+            raise ValueError(f"Unsupported scenario file type: {extension}")
+
+    scenarios = []
+    for record in records:
+        scenario = {}
+        for field, names in FIELDS.items():
+            value = next((record[name] for name in names if record.get(name) not in (None, "")), None)
+            scenario[field] = value
+        if scenario["lumbda"] is None or scenario["mu"] is None:
+            raise ValueError(f"Scenario is missing an arrival or service rate: {record}")
+        scenario["lumbda"] = float(scenario["lumbda"])
+        scenario["mu"] = float(scenario["mu"])
+        scenario["numberOfServers"] = int(scenario["numberOfServers"] or 1)
+        capacity = None if scenario["systemCapacity"] is None else float(scenario["systemCapacity"])
+        scenario["systemCapacity"] = inf if capacity is None or capacity == inf or capacity <= 0 else int(capacity)
+        scenarios.append(scenario)
+    return scenarios
+
+
+def evaluate(scenario, num_customers=0, seed=None):
+    """Evaluates one scenario analytically and, when num_customers > 0, by simulation.
+
+    Errors of the model or the simulation, such as an unstable configuration,
+    are reported in the "error" field of the row instead of being raised.
+    """
+    row = dict(scenario)
+    row.update({name: None for name in MEASURES})
+    row["error"] = None
+    args = (scenario["lumbda"], scenario["mu"], scenario["numberOfServers"], scenario["systemCapacity"])
+    try:
+        measures = solve(*args)
+        row.update({name: getattr(measures, name) for name in MEASURES})
+    except (ValueError, ZeroDivisionError, OverflowError) as e:
+        row["error"] = str(e)
+
+    if num_customers:
+        row.update({name: None for name in SIMULATED})
+    if num_customers and row["error"] is None:
+        try:
+            summary = simulate_multi(*args, num_customers=num_customers, seed=seed).summary()
+            row.update({"sim_" + name: value for name, value in summary.items()})
+        except (ValueError, ZeroDivisionError, OverflowError) as e:
+            row["error"] = str(e)
+    return row
+
+
+def _evaluate_chunk(scenarios, num_customers, seeds):
+    """Evaluates a chunk of scenarios in a worker process."""
+    return [evaluate(scenario, num_customers, seed) for scenario, seed in zip(scenarios, seeds)]
+
+
+def run_batch(scenarios, num_customers=0, seed=None, processes=None):
+    """Evaluates scenarios across a process pool and returns one result row per scenario, in order.
+
+    Each scenario simulates from its own stream spawned from a single
+    SeedSequence, so results do not depend on the number of processes.
+    """
+    seeds = np.random.SeedSequence(seed).spawn(len(scenarios))
+    processes = min(processes or os.cpu_count() or 1, max(len(scenarios), 1))
+    if processes == 1:
+        return _evaluate_chunk(scenarios, num_customers, seeds)
+
+    bounds = np.linspace(0, len(scenarios), min(processes * 4, len(scenarios)) + 1).astype(int)
+    with ProcessPoolExecutor(processes) as pool:
+        futures = [pool.submit(_evaluate_chunk, scenarios[start:stop], num_customers, seeds[start:stop])
+                   for start, stop in zip(bounds[:-1], bounds[1:])]
+        return [row for future in futures for row in future.result()]
+
+
+def write_results(rows, path):
+    """Writes result rows as CSV, JSON Lines, or NumPy .npz columns depending on the file extension."""
+    extension = os.path.splitext(path)[1].lower()
+    columns = list(rows[0]) if rows else list(FIELDS) + list(MEASURES) + ["error"]
+
+    if extension == ".csv":
+        with open(path, "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(rows)
+    elif extension == ".jsonl":
+        with open(path, "w") as file:
+            for row in rows:
+                file.write(json.dumps({name: _json_value(value) for name, value in row.items()}) + "\n")
+    elif extension == ".npz":
+        arrays = {}
+        for name in columns:
+            values = [row[name] for row in rows]
+            if name == "error":
+                arrays[name] = np.array(["" if value is None else value for value in values])
+            else:
+                arrays[name] = np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+        np.savez(path, **arrays)
+    else:
+        raise ValueError(f"Unsupported output file type: {extension}")
+
+
+def _json_value(value):
+    """Maps infinite and NaN floats to JSON-safe values."""
+    if isinstance(value, float) and (value == inf or isnan(value)):
+        return None if isnan(value) else "inf"
+    return value
@@ -0,0 +1,244 @@
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from math import inf
+
+import numpy as np
+
+from models import MM1, MM1K, MMC, MMCK, model
+from simulation import simulate_multi, simulate_single
+
+
+# Customers per simulated run, 10^3 to 10^8.
+SIZES = tuple(10 ** k for k in range(3, 9))
+
+# Server counts the model constructors are timed with.
+SERVER_COUNTS = (1, 10, 100, 1000, 10000)
+
+# Utilization of every benchmarked system.
+UTILIZATION = 0.9
+
+# Systems whose simulated measures are checked against the analytic model: (c, K).
+ACCURACY_SYSTEMS = ((1, inf), (1, 10), (10, inf), (10, 20))
+
+MEASURES = ("W", "Wq", "L")
+
+# Every timed entry is repeated until it has run for this long in total, so short runs are not timing noise.
+MIN_SECONDS = 0.2
+
+# Increase of a relative error, in absolute terms, that compare reports as an accuracy regression.
+ACCURACY_TOLERANCE = 0.01
+
+
+def _timed(function, *args, repeat=1, min_seconds=MIN_SECONDS):
+    """Returns the best wall time in seconds of calling function(*args) and the result of the last call.
+
+    The call is made at least repeat times, and again until min_seconds have been spent in total.
+    """
+    best, spent, calls = inf, 0.0, 0
+    while calls < repeat or spent < min_seconds:
+        start = time.perf_counter()
+        result = function(*args)
+        elapsed = time.perf_counter() - start
+        best, spent, calls = min(best, elapsed), spent + elapsed, calls + 1
+    return best, result
+
+
+def _peak_memory(function, *args):
+    """Returns the peak memory in bytes traced (Python and NumPy allocations) while calling function(*args)."""
+    tracemalloc.start()
+    try:
+        function(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _relative_errors(simulated, system):
+    """Returns the relative error of the simulated W, Wq and L against an analytic model."""
+    analytic = system.measures()
+    return {measure: abs(simulated[measure] - getattr(analytic, measure)) / getattr(analytic, measure)
+            for measure in MEASURES}
+
+
+def benchmark_simulate(sizes=SIZES, mu=1.0, seed=1, chart=True):
+    """Times simulate's M/M/1 engine, and optionally chart, for each number of customers.
+
+    Each run is timed without tracing and then repeated under tracemalloc for
+    its peak memory, so the tracing overhead does not skew the throughput.
+    """
+    lumbda = UTILIZATION * mu
+    system = MM1(lumbda, mu)
+
+    # Warm up imports and first-call costs so they are not charged to the smallest size
+    warm_up = simulate_single(lumbda, mu, 1000, seed)
+    if chart:
+        _draw_chart(warm_up)
+
+    rows = []
+    for num_customers in sizes:
+        seconds, result = _timed(simulate_single, lumbda, mu, num_customers, seed)
+        row = {
+            "customers": num_customers,
+            "seconds": seconds,
+            "customers_per_second": num_customers / seconds,
+            "peak_memory_bytes": _peak_memory(simulate_single, lumbda, mu, num_customers, seed),
+            "relative_error": _relative_errors(result.summary(), system),
+        }
+        if chart:
+            row["chart_seconds"] = _timed(_draw_chart, result)[0]
+        rows.append(row)
+        del result
+    return rows
+
+
+def _draw_chart(result):
+    import matplotlib
+
+    # Draw without a window, plt.show() is then a no-op
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from plotting import chart
+
+    chart(result)
+    plt.gcf().canvas.draw()
+    plt.close("all")
+
+
+def benchmark_models(server_counts=SERVER_COUNTS, mu=1.0, repeat=5):
+    """Times constructing and solving each analytic model for each number of servers."""
+    rows = []
+    for c in server_counts:
+        lumbda = UTILIZATION * c * mu
+        builders = {"MMC": (MMC, lumbda, mu, c), "MMCK": (MMCK, lumbda, mu, c, 2 * c)}
+        if c == 1:
+            builders = {"MM1": (MM1, lumbda, mu), "MM1K": (MM1K, lumbda, mu, 10), **builders}
+        for name, (cls, *args) in builders.items():
+            seconds = _timed(lambda: cls(*args).measures(), repeat=repeat)[0]
+            rows.append({"model": name, "servers": c, "seconds": seconds})
+    return rows
+
+
+def benchmark_accuracy(systems=ACCURACY_SYSTEMS, num_customers=10 ** 6, mu=1.0, seed=1):
+    """Simulates each (c, K) system with simulate_multi and compares it with the analytic model."""
+    rows = []
+    for c, K in systems:
+        lumbda = UTILIZATION * c * mu
+        seconds, result = _timed(simulate_multi, lumbda, mu, c, K, num_customers, seed)
+        system = model(lumbda, mu, c, K)
+        rows.append({
+            "servers": c,
+            "capacity": None if K == inf else K,
+            "customers": num_customers,
+            "seconds": seconds,
+            "customers_per_second": num_customers / seconds,
+            "relative_error": _relative_errors(result.summary(), system),
+        })
+    return rows
+
+
+def run_benchmarks(sizes=SIZES, server_counts=SERVER_COUNTS, accuracy_customers=10 ** 6, chart=True, seed=1):
+    """Runs the simulation, model and accuracy benchmarks and returns a JSON-ready report."""
+    return {
+        "commit": _commit(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.platform(),
+        "simulate": benchmark_simulate(sizes, seed=seed, chart=chart),
+        "models": benchmark_models(server_counts),
+        "accuracy": benchmark_accuracy(num_customers=accuracy_customers, seed=seed),
+    }
+
+
+def _commit():
+    """Returns the current git commit of the repository, or None outside a checkout."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save(report, path):
+    with open(path, "w") as file:
+        json.dump(report, file, indent=2)
+
+
+def load(path):
+    with open(path) as file:
+        return json.load(file)
+
+
+def display(report):
+    """Prints a benchmark report as plain text tables."""
+    print(f"Commit {report['commit']} on {report['machine']} ({report['date']})")
+    print(f"\n{'Customers':>12}{'Seconds':>12}{'Customers/s':>14}{'Peak MB':>10}{'Chart s':>10}"
+          + "".join(f"{'Err ' + m:>10}" for m in MEASURES))
+    for row in report["simulate"]:
+        chart = f"{row['chart_seconds']:>10.3f}" if "chart_seconds" in row else f"{'':>10}"
+        print(f"{row['customers']:>12}{row['seconds']:>12.4f}{row['customers_per_second']:>14.3g}"
+              f"{row['peak_memory_bytes'] / 2 ** 20:>10.1f}{chart}"
+              + "".join(f"{row['relative_error'][m]:>10.2%}" for m in MEASURES))
+
+    print(f"\n{'Model':>12}{'Servers':>12}{'Seconds':>14}")
+    for row in report["models"]:
+        print(f"{row['model']:>12}{row['servers']:>12}{row['seconds']:>14.3g}")
+
+    print(f"\n{'Servers':>12}{'Capacity':>12}{'Customers/s':>14}" + "".join(f"{'Err ' + m:>10}" for m in MEASURES))
+    for row in report["accuracy"]:
+        capacity = "inf" if row["capacity"] is None else row["capacity"]
+        print(f"{row['servers']:>12}{capacity:>12}{row['customers_per_second']:>14.3g}"
+              + "".join(f"{row['relative_error'][m]:>10.2%}" for m in MEASURES))
+
+
+def compare(baseline, report, tolerance=0.2, accuracy_tolerance=ACCURACY_TOLERANCE):
+    """Prints the throughput, model timings and accuracy of a report relative to a baseline report.
+
+    Only runs of the same number of customers are compared.
+
+    Returns:
+        List[str]: The entries that are more than tolerance (as a fraction) slower than the
+        baseline, and the relative errors that grew by more than accuracy_tolerance.
+    """
+    regressions = []
+
+    def check(name, speedup):
+        print(f"{name:<40}{speedup:>10.2f}x")
+        if speedup < 1 - tolerance:
+            regressions.append(name)
+
+    def check_accuracy(name, errors, before_errors):
+        for measure in MEASURES:
+            if measure in errors and measure in before_errors:
+                error, before_error = errors[measure], before_errors[measure]
+                print(f"{name + ' error ' + measure:<40}{before_error:>10.2%} -> {error:.2%}")
+                if error > before_error + accuracy_tolerance:
+                    regressions.append(f"{name} error {measure}")
+
+    print(f"{report['commit']} vs {baseline['commit']} (speedup, >1 is faster)")
+    before = {row["customers"]: row for row in baseline["simulate"]}
+    for row in report["simulate"]:
+        if row["customers"] in before:
+            check(f"simulate {row['customers']}",
+                  row["customers_per_second"] / before[row["customers"]]["customers_per_second"])
+            check_accuracy(f"simulate {row['customers']}", row["relative_error"],
+                           before[row["customers"]]["relative_error"])
+    before = {(row["model"], row["servers"]): row for row in baseline["models"]}
+    for row in report["models"]:
+        key = (row["model"], row["servers"])
+        if key in before:
+            check(f"{row['model']} c={row['servers']}", before[key]["seconds"] / row["seconds"])
+    # Errors shrink with the run length, so accuracy runs are matched on their number of customers too
+    before = {(row["servers"], row["capacity"], row["customers"]): row for row in baseline.get("accuracy", ())}
+    for row in report.get("accuracy", ()):
+        key = (row["servers"], row["capacity"], row["customers"])
+        if key in before:
+            name = f"accuracy c={row['servers']} K={'inf' if row['capacity'] is None else row['capacity']}"
+            check(name, row["customers_per_second"] / before[key]["customers_per_second"])
+            check_accuracy(name, row["relative_error"], before[key]["relative_error"])
+    return regressions
@@ -0,0 +1,133 @@
+from math import inf
+
+import numpy as np
+
+from models import log_erlang_b
+
+
+def _log_geometric(x, n):
+    """Returns log(sum(x^j, j < n)) elementwise, without overflow for x > 1."""
+    with np.errstate(all="ignore"):
+        a = n * np.log(x)
+        log_sum = np.where(x > 1, a + np.log(-np.expm1(-a)), np.log(-np.expm1(a))) - np.log(np.abs(1 - x))
+        return np.where(n == 0, -inf, np.where(x == 1, np.log(n), log_sum))
+
+
+def _measures(lumbda, mu, c, systemCapacity, log_b):
+    """Returns Wq, the probability of waiting and the blocking probability of M/M/c(/K) queues.
+
+    Evaluated elementwise over arrays of server counts c with their log
+    Erlang-B values, in log space so that large waiting rooms with ru > 1 do
+    not overflow. Unstable points get an infinite Wq.
+    """
+    ru = lumbda / (mu * c)
+    b = np.exp(log_b)
+    with np.errstate(all="ignore"):
+        if systemCapacity == inf:
+            # Erlang C, P(wait) = B / (1 - ru (1 - B))
+            p_wait = np.where(ru < 1, b / (1 - ru * (1 - b)), 1.0)
+            wq = np.where(ru < 1, p_wait / (mu * c - lumbda), inf)
+            return {"Wq": wq, "P_wait": p_wait, "P_block": np.zeros_like(wq)}
+
+        waiting_room = systemCapacity - c
+        log_g = _log_geometric(ru, waiting_room + 1)
+        # Probability of exactly c customers, P(c) = B / (1 - B + B G)
+        log_p_c = log_b - np.logaddexp(np.log1p(-b), log_b + log_g)
+        p_block = np.exp(log_p_c + waiting_room * np.log(ru))
+        p_wait = np.minimum(np.exp(log_p_c + _log_geometric(ru, waiting_room) - np.log1p(-p_block)), 1)
+
+        # Lq = P(c) H with H = sum(j ru^j, j <= K - c), scaled by ru^(K-c+1) when ru > 1
+        one = np.isclose(ru, 1)
+        x = np.where(one, 0.5, ru)
+        below = x * (1 - (waiting_room + 1) * x ** waiting_room + waiting_room * x ** (waiting_room + 1)) / (1 - x) ** 2
+        log_above = ((waiting_room + 1) * np.log(x) + np.log(x ** -waiting_room - (waiting_room + 1) + waiting_room * x)
+                     - 2 * np.log(np.abs(x - 1)))
+        log_h = np.where(one, np.log(waiting_room * (waiting_room + 1) / 2), np.where(x > 1, log_above, np.log(below)))
+        wq = np.exp(log_p_c + log_h) / (lumbda * (1 - p_block))
+        return {"Wq": wq, "P_wait": p_wait, "P_block": p_block}
+
+
+def _meets(measures, maxWq, maxPWait, maxPBlock):
+    """Returns a boolean array of the points whose measures meet every target that is not None."""
+    ok = np.ones(np.shape(measures["Wq"]), dtype=bool)
+    for name, target in (("Wq", maxWq), ("P_wait", maxPWait), ("P_block", maxPBlock)):
+        if target is not None:
+            ok &= measures[name] <= target
+    return ok
+
+
+def min_servers(lumbda, mu, systemCapacity=inf, maxWq=None, maxPWait=None, maxPBlock=None, limit=10 ** 6):
+    """Finds the minimum number of servers c for which an M/M/c or M/M/c/K queue meets every given target.
+
+    Every candidate c comes out of one Erlang-B pass over c = 1..n (see
+    models.log_erlang_b) instead of a model built per c, with n doubled until a c
+    meets the targets, so searches over c up to 10^5 take tens of milliseconds.
+
+    Args:
+        lumbda (float): Arrival rate.
+        mu (float): Service rate of each server.
+        systemCapacity (int): Maximum number of customers in the system (K), c is then at most K.
+        maxWq (float, optional): Largest acceptable mean time in queue.
+        maxPWait (float, optional): Largest acceptable probability that an admitted customer waits.
+        maxPBlock (float, optional): Largest acceptable probability that an arrival is blocked.
+        limit (int): Largest number of servers considered.
+
+    Returns:
+        int: The smallest c meeting all targets.
+    """
+    if maxWq is None and maxPWait is None and maxPBlock is None:
+        raise ValueError("At least one target (maxWq, maxPWait or maxPBlock) must be given.")
+    if lumbda <= 0 or mu <= 0:
+        raise ValueError("Arrival and service rates must be positive.")
+
+    r = lumbda / mu
+    top = min(limit, systemCapacity)
+    n = min(max(2 * int(r) + 2, 16), top)
+    while True:
+        c = np.arange(1, n + 1)
+        measures = _measures(lumbda, mu, c, systemCapacity, log_erlang_b(r, n)[1:])
+        ok = _meets(measures, maxWq, maxPWait, maxPBlock)
+        if ok.any():
+            return int(c[np.argmax(ok)])
+        if n >= top:
+            raise ValueError(f"No number of servers up to {n} meets the targets.")
+        n = min(2 * n, top)
+
+
+def max_arrival_rate(mu, numberOfServers, systemCapacity=inf, maxWq=None, maxPWait=None, maxPBlock=None,
+                     tolerance=1e-9):
+    """Finds the largest arrival rate an M/M/c or M/M/c/K queue can take while meeting every given target.
+
+    Bisects on lumbda, as Wq, P(wait) and blocking all grow with it. Each
+    step takes B(c) from one O(c) pass of models.log_erlang_b instead of
+    building a new model.
+
+    Returns:
+        float: The largest such lumbda, within tolerance relative to it, or inf
+        when the targets hold at any load (e.g. Wq with a finite capacity).
+    """
+    if maxWq is None and maxPWait is None and maxPBlock is None:
+        raise ValueError("At least one target (maxWq, maxPWait or maxPBlock) must be given.")
+    c = numberOfServers
+    if systemCapacity < c:
+        raise ValueError("System capacity must be at least the number of servers.")
+
+    def meets(lumbda):
+        log_b = log_erlang_b(lumbda / mu, c)[-1:]
+        measures = _measures(lumbda, mu, np.array([c]), systemCapacity, log_b)
+        return bool(_meets(measures, maxWq, maxPWait, maxPBlock)[0])
+
+    low, high = 0.0, c * mu
+    if systemCapacity != inf:
+        # Any load is stable with a finite capacity, look for a load that breaks the targets
+        while meets(high):
+            high *= 2
+            if high > c * mu * 2 ** 32:
+                return inf
+    while high - low > tolerance * high:
+        middle = (low + high) / 2
+        if meets(middle):
+            low = middle
+        else:
+            high = middle
+    return low
@@ -0,0 +1,152 @@
+from math import log, sqrt
+
+import numpy as np
+
+
+class Distribution:
+    """
+    Represents the distribution of interarrival or service times.
+    This class serves as an abstract base class for specific distributions.
+
+    Variates are written into caller-provided float64 buffers with fill(), so
+    simulations can draw a whole block of customers in one call and reuse the
+    same buffers from block to block.
+    """
+
+    mean = None
+
+    def fill(self, rng, out):
+        """Fills the array out with variates drawn from the numpy.random.Generator rng and returns it."""
+        raise NotImplementedError("This method should be implemented in subclasses.")
+
+    def sample(self, rng, size):
+        """Returns a new array of size variates drawn from the numpy.random.Generator rng."""
+        return self.fill(rng, np.empty(size))
+
+
+class Exponential(Distribution):
+    """
+    Exponential times with the given rate (mean 1 / rate).
+    """
+
+    def __init__(self, rate):
+        if rate <= 0:
+            raise ValueError("Rate must be positive.")
+        self.rate = rate
+        self.mean = 1 / rate
+
+    def fill(self, rng, out):
+        rng.standard_exponential(out=out)
+        out *= self.mean
+        return out
+
+
+class Deterministic(Distribution):
+    """
+    Constant times, e.g. the D in M/D/1.
+    """
+
+    def __init__(self, value):
+        if value < 0:
+            raise ValueError("Value must not be negative.")
+        self.mean = value
+
+    def fill(self, rng, out):
+        out.fill(self.mean)
+        return out
+
+
+class Erlang(Distribution):
+    """
+    Erlang-k times with overall rate (mean 1 / rate), i.e. k exponential phases of rate k * rate each.
+    """
+
+    def __init__(self, k, rate):
+        if k < 1 or int(k) != k:
+            raise ValueError("Number of phases must be a positive integer.")
+        if rate <= 0:
+            raise ValueError("Rate must be positive.")
+        self.k = int(k)
+        self.rate = rate
+        self.mean = 1 / rate
+
+    def fill(self, rng, out):
+        rng.standard_gamma(self.k, out=out)
+        out *= self.mean / self.k
+        return out
+
+
+class HyperExponential(Distribution):
+    """
+    Mixture of exponential times: with probability probabilities[i] the time has rate rates[i].
+    """
+
+    def __init__(self, probabilities, rates):
+        probabilities = np.asarray(probabilities, dtype=np.float64)
+        rates = np.asarray(rates, dtype=np.float64)
+        if probabilities.shape != rates.shape or not np.isclose(probabilities.sum(), 1):
+            raise ValueError("Probabilities must sum to 1 and match the rates.")
+        if np.any(rates <= 0) or np.any(probabilities < 0):
+            raise ValueError("Rates must be positive and probabilities not negative.")
+        self.probabilities = probabilities
+        self.rates = rates
+        self.mean = float(np.sum(probabilities / rates))
+        self._cumulative = np.cumsum(probabilities)
+
+    def fill(self, rng, out):
+        branches = np.searchsorted(self._cumulative[:-1], rng.random(len(out)), side="right")
+        rng.standard_exponential(out=out)
+        out /= self.rates[branches]
+        return out
+
+
+class LogNormal(Distribution):
+    """
+    Lognormal times with the given mean and coefficient of variation (standard deviation / mean).
+    """
+
+    def __init__(self, mean, cv):
+        if mean <= 0 or cv < 0:
+            raise ValueError("Mean must be positive and the coefficient of variation not negative.")
+        self.mean = mean
+        self.cv = cv
+        self._sigma = sqrt(log(1 + cv * cv))
+        self._mu = log(mean) - self._sigma ** 2 / 2
+
+    def fill(self, rng, out):
+        rng.standard_normal(out=out)
+        out *= self._sigma
+        out += self._mu
+        np.exp(out, out=out)
+        return out
+
+
+class Empirical(Distribution):
+    """
+    Resamples times uniformly at random from a recorded trace.
+    """
+
+    def __init__(self, samples):
+        samples = np.asarray(samples, dtype=np.float64)
+        if samples.ndim != 1 or not len(samples):
+            raise ValueError("Samples must be a non-empty one-dimensional array.")
+        if np.any(samples < 0):
+            raise ValueError("Samples must not be negative.")
+        self.samples = samples
+        self.mean = float(samples.mean())
+
+    @classmethod
+    def from_file(cls, path):
+        """Loads the trace from a .npy file or a text file with one value per line."""
+        if path.endswith(".npy"):
+            return cls(np.load(path))
+        return cls(np.loadtxt(path, ndmin=1))
+
+    def fill(self, rng, out):
+        np.take(self.samples, rng.integers(len(self.samples), size=len(out)), out=out)
+        return out
+
+
+def as_distribution(value):
+    """Returns value if it is a Distribution, otherwise exponential times with value as the rate."""
+    return value if isinstance(value, Distribution) else Exponential(value)
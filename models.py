@@ -1,7 +1,12 @@
-from parameter import Params
-from math import pow, factorial
+from parameter import Params, Measures
+from math import pow, exp, log, log1p, lgamma
 from math import inf
-from simulation import simulate, chart
+from functools import lru_cache
+
+from profiling import count, phase
+
+# NumPy and the simulation layer are imported inside the functions that use
+# them, so that importing the analytic models alone stays fast.
 
 
 ###M/M/1
@@ -20,38 +25,25 @@ class MM1(Params):
 
         super().__init__(lumbda, mu)   
 
-
-    def findL(self):
-        """Calculates and returns the average number of customers in the system (L)."""
-        return self.lumbda / (self.mu - self.lumbda)   
-
-    def findLq(self):
-        """Calculates and returns the average number of customers in the queue (Lq)."""
-        return (self.findL() * self.lumbda) / self.mu   
-
-    def findW(self):
-        """Calculates and returns the average time a customer spends in the system (W)."""
-        return 1 / (self.mu - self.lumbda)
-
-    def findWq(self):
-        """Calculates and returns the average time a customer spends in the queue (Wq)."""
-        return (self.findW() * self.lumbda) / self.mu   
+    def _solve(self):
+        """Calculates all the performance measures in one pass."""
+        ru = self.findRu()
+        L = self.lumbda / (self.mu - self.lumbda)
+        W = 1 / (self.mu - self.lumbda)
+        return Measures(L=L, Lq=L * ru, W=W, Wq=W * ru, Ru=ru, P0=1 - ru)
 
     def findPk(self, k):
         """Calculates and returns the probability of having k customers in the system (Pk)."""
         return pow(self.findRu(), k) * (1 - self.findRu())
 
+    def distribution(self, n_max):
+        """Calculates and returns the array of probabilities P(0), ..., P(n_max) of n customers in the system."""
+        return _distribution(self.findRu(), 1, log1p(-self.findRu()), n_max)
+
     def findRu(self):
         """Calculates and returns the server utilization (Ru)."""
         return self.lumbda / self.mu
 
-    def display(self):
-        print(f"L: {self.findL()}")
-        print(f"Lq: {self.findLq()}")
-        print(f"W: {self.findW()}")
-        print(f"Wq: {self.findWq()}")
-        print(f"Ru: {self.findRu()}")
-
 
 ####M/M/1/K
 class MM1K(Params):  
@@ -75,33 +67,42 @@ class MM1K(Params):
         self._ruK = pow(self._ru, systemCapacity)
         self._ruK1 = pow(self._ru, systemCapacity + 1)
 
-    def findL(self):
-        """Calculates and returns the average number of customers in the system (L)."""
+    def _solve(self):
+        """Calculates all the performance measures in one pass."""
         if self._ru == 1:
-            return self._sc / 2.0   
+            L = self._sc / 2.0
         else:
             numerator = self._ru * (1 - (self._sc + 1) * self._ruK + self._sc * self._ruK1)
             denominator = (1 - self._ru) * (1 - self._ruK1)
-            return numerator / denominator
-
-    def findLq(self):
-        """Calculates and returns the average number of customers in the queue (Lq)."""
-        return self._findLambdaDash() * self.findWq()
+            L = numerator / denominator
 
-    def findW(self):
-        """Calculates and returns the average time a customer spends in the system (W)."""
-        return self.findL() / self._findLambdaDash()
-
-    def findWq(self):
-        """Calculates and returns the average time a customer spends in the queue (Wq)."""
-        return self.findW() - (1.0 / self.mu)
+        lambdaDash = self._findLambdaDash()
+        W = L / lambdaDash
+        Wq = W - (1.0 / self.mu)
+        return Measures(L=L, Lq=lambdaDash * Wq, W=W, Wq=Wq, Ru=self._ru, P0=self.findP0())
 
     def findPk(self, k):
         """Calculates and returns the probability of having k customers in the system (Pk)."""
+        if k > self._sc:
+            return 0.0
+        return pow(self._ru, k) * self.findP0()
+
+    def findP0(self):
+        """Calculates and returns the probability of having 0 customers in the system (P0)."""
         if self._ru == 1:
             return 1.0 / (self._sc + 1.0)
         else:
-            return self._ruK * ((1 - self._ru) / (1 - self._ruK1))
+            return (1 - self._ru) / (1 - self._ruK1)
+
+    def distribution(self, n_max):
+        """Calculates and returns the array of probabilities P(0), ..., P(n_max) of n customers in the system."""
+        return _distribution(self._ru, 1, log(self.findP0()), n_max, self._sc)
+
+    def transient(self, times, initial=0):
+        """Calculates P(n, t) on a grid of times starting from initial customers at time 0 (see transient.transient)."""
+        from transient import transient
+
+        return transient(self.lumbda, self.mu, 1, self._sc, times, initial)
 
     def _findLambdaDash(self):
         """Calculates and returns the effective arrival rate (lambda_dash)."""
@@ -111,13 +112,6 @@ class MM1K(Params):
         """Calculates and returns the server utilization (Ru)."""
         return self.lumbda / self.mu
 
-    def display(self):
-        print(f"L: {self.findL()}")
-        print(f"Lq: {self.findLq()}")
-        print(f"W: {self.findW()}")
-        print(f"Wq: {self.findWq()}")
-        print(f"Ru: {self.findRu()}")
-
 
 ###M/M/C
 class MMC(Params):   
@@ -138,35 +132,24 @@ class MMC(Params):
         super().__init__(lumbda, mu, numberOfServers=numberOfServers)
         self.c = numberOfServers
         self.findR = self.lumbda / self.mu   
+        self._erlangB, self._logS = _erlang(self.findR, self.c)
         self.P0 = self.findP0() 
-        self._Lq = self.findLq()   
-          
-
 
-    def findL(self):
-        """Calculates and returns the average number of customers in the system (L)."""
-        return self._Lq + self.findR  
-
-    def findLq(self):
-        """Calculates and returns the average number of customers in the queue (Lq)."""
-        numerator = (pow(self.findR, self.c + 1) / self.c)
-        denominator = factorial(self.c) * (pow(1 - (self.findR / self.c), 2))
-        return (numerator / denominator) * self.P0
-
-    def findW(self):
-        """Calculates and returns the average time a customer spends in the system (W)."""
-        return (self._Lq / self.lumbda) + (1 / self.mu)
-
-    def findWq(self):
-        """Calculates and returns the average time a customer spends in the queue (Wq)."""
-        return self._Lq / self.lumbda
+    def _solve(self):
+        """Calculates all the performance measures in one pass."""
+        ru = self.findRu()
+        erlangC = self._erlangB / (1 - ru * (1 - self._erlangB))
+        Lq = erlangC * ru / (1 - ru)
+        Wq = Lq / self.lumbda
+        return Measures(L=Lq + self.findR, Lq=Lq, W=Wq + 1 / self.mu, Wq=Wq, Ru=ru, P0=self.P0)
 
     def findPk(self, k):
         """Calculates and returns the probability of having k customers in the system (Pk)."""
-        if k < self.c:
-            return (pow(self.lumbda, k) / (factorial(k) * pow(self.mu, k))) * self.P0
-        else:
-            return (pow(self.lumbda, k) / (pow(self.c, k - self.c) * factorial(self.c) * pow(self.mu, k))) * self.P0
+        return _stationary(self.findR, self.c, self._logP0, k)
+
+    def distribution(self, n_max):
+        """Calculates and returns the array of probabilities P(0), ..., P(n_max) of n customers in the system."""
+        return _distribution(self.findR, self.c, self._logP0, n_max)
 
     def findRu(self):
         """Calculates and returns the server utilization (Ru)."""
@@ -174,26 +157,10 @@ class MMC(Params):
 
     def findP0(self):
         """Calculates and returns the probability of having 0 customers in the system (P0)."""
-        r = self.findR
+        # P0 = 1 / (S(c-1) + (r^c / c!) / (1 - ru)), divided through by S(c) = S(c-1) / (1 - B)
         ru = self.findRu()
-        c = self.c
-        first = 0
-
-        if ru < 1:
-            for i in range(c):
-                first += pow(r, i) / factorial(i)
-            return 1 / (first + ((c * pow(r, c)) / (factorial(c) * (c - r))))
-        else:
-            for i in range(c):
-                first += (1 / factorial(i)) * pow(r, i)
-            return 1 / (first + ((1 / factorial(c)) * pow(r, c) * ((c * self.mu) / (c * self.mu - self.lumbda))))
-
-    def display(self):
-        print(f"L: {self.findL()}")
-        print(f"Lq: {self.findLq()}")
-        print(f"W: {self.findW()}")
-        print(f"Wq: {self.findWq()}")
-        print(f"Ru: {self.findRu()}")
+        self._logP0 = -self._logS - log(1 - self._erlangB + self._erlangB / (1 - ru))
+        return exp(self._logP0)
 
 
 ####M/M/C/K
@@ -218,78 +185,283 @@ class MMCK(Params):
         self.c = numberOfServers
         self.sc = systemCapacity
         self.findR = self.lumbda / self.mu   
+        self._erlangB, self._logS = _erlang(self.findR, self.c)
         self.findp0 = self.findP0()  
         self.findLambdaDash = self.lumbda * (1 - self.findPk(self.sc))  
 
-    def findL(self):
-        """Calculates and returns the average number of customers in the system (L)."""
-        last = sum((self.c - i) * (pow(self.findR, i) / factorial(i)) for i in range(self.c))
-        return self.findLq() + self.c - self.findp0 * last
-
-    def findLq(self):
-        """Calculates and returns the average number of customers in the queue (Lq)."""
+    def _solve(self):
+        """Calculates all the performance measures in one pass."""
         ru = self.findRu()
-        numerator = ru * pow(self.findR, self.c) * self.findp0
-        denominator = factorial(self.c) * pow(1 - ru, 2)
-        blocking_factor = (1 - pow(ru, self.sc - self.c + 1) - (1 - ru) * (self.sc - self.c + 1) * pow(ru, self.sc - self.c))
-        return (numerator / denominator) * blocking_factor
-
-    def findW(self):
-        """Calculates and returns the average time a customer spends in the system (W)."""
-        return self.findL() / self.findLambdaDash
+        Pc = _stationary(self.findR, self.c, self._logP0, self.c)
+        waitingRoom = self.sc - self.c
+        if ru == 1:
+            Lq = Pc * waitingRoom * (waitingRoom + 1) / 2
+        else:
+            blocking_factor = (1 - pow(ru, waitingRoom + 1) - (1 - ru) * (waitingRoom + 1) * pow(ru, waitingRoom))
+            Lq = Pc * ru * blocking_factor / pow(1 - ru, 2)
 
-    def findWq(self):
-        """Calculates and returns the average time a customer spends in the queue (Wq)."""
-        return self.findLq() / self.findLambdaDash
+        # The mean number of busy servers is the effective load lambda_dash / mu
+        L = Lq + self.findLambdaDash / self.mu
+        return Measures(L=L, Lq=Lq, W=L / self.findLambdaDash, Wq=Lq / self.findLambdaDash,
+                        Ru=ru, P0=self.findp0)
 
     def findPk(self, n):
         """Calculates and returns the probability of having n customers in the system (Pk)."""
-        if n < self.c:
-            return (pow(self.findR, n) / factorial(n)) * self.findp0
-        return (pow(self.findR, n) / (pow(self.c, n - self.c) * factorial(self.c))) * self.findp0
+        if n > self.sc:
+            return 0.0
+        return _stationary(self.findR, self.c, self._logP0, n)
+
+    def distribution(self, n_max):
+        """Calculates and returns the array of probabilities P(0), ..., P(n_max) of n customers in the system."""
+        return _distribution(self.findR, self.c, self._logP0, n_max, self.sc)
+
+    def transient(self, times, initial=0):
+        """Calculates P(n, t) on a grid of times starting from initial customers at time 0 (see transient.transient)."""
+        from transient import transient
+
+        return transient(self.lumbda, self.mu, self.c, self.sc, times, initial)
 
     def findP0(self):
         """Calculates and returns the probability of having 0 customers in the system (P0)."""
-        first = sum(pow(self.findR, i) / factorial(i) for i in range(self.c))
+        # P0 = 1 / (S(c-1) + (r^c / c!) * sum(ru^j, j <= K - c)), divided through by S(c) = S(c-1) / (1 - B)
         ru = self.findRu()
         if ru != 1:
-            return 1 / (first + (pow(self.findR, self.c) / factorial(self.c)) * ((1 - pow(ru, self.sc - self.c + 1)) / (1 - ru)))
+            geometric = (1 - pow(ru, self.sc - self.c + 1)) / (1 - ru)
         else:
-            return 1 / (first + (pow(self.findR, self.c) / factorial(self.c)) * (self.sc - self.c + 1))
+            geometric = self.sc - self.c + 1
+        self._logP0 = -self._logS - log(1 - self._erlangB + self._erlangB * geometric)
+        return exp(self._logP0)
 
     def findRu(self):
         """Calculates and returns the server utilization (Ru)."""
         return self.findR / self.c
 
-    def display(self):
-        print(f"L: {self.findL()}")
-        print(f"Lq: {self.findLq()}")
-        print(f"W: {self.findW()}")
-        print(f"Wq: {self.findWq()}")
-        print(f"Ru: {self.findRu()}")
 
-    
-def solution(lumbda, mu, numberOfServers=1, systemCapacity=inf):
+def _erlang(r, c):
+    """Returns the Erlang-B blocking probability B(c, r) and log(S(c)), S(c) = sum(r^i / i!, i <= c).
+
+    Runs B(k) = r B(k-1) / (k + r B(k-1)) and S(k) = S(k-1) / (1 - B(k)) from
+    B(0) = S(0) = 1, in O(c) float-only steps that stay accurate for large c.
+    """
+    b, logS = 1.0, 0.0
+    for k in range(1, c + 1):
+        b = r * b / (k + r * b)
+        logS -= log1p(-b)
+    return b, logS
+
+
+def _stationary(r, c, logP0, n):
+    """Returns P(n) of a c-server birth-death queue, P0 r^n / n! below c and P0 r^n / (c! c^(n-c)) above, in log space."""
+    if r == 0:
+        return exp(logP0) if n == 0 else 0.0
+    if n < c:
+        return exp(logP0 + n * log(r) - lgamma(n + 1))
+    return exp(logP0 + n * log(r) - lgamma(c + 1) - (n - c) * log(c))
+
+
+def _distribution(r, c, logP0, n_max, capacity=inf):
+    """Returns P(0..n_max) of a c-server birth-death queue with the ratio P(n) / P(n-1) = r / min(n, c).
+
+    The ratios are accumulated in log space, so each term costs O(1) and large
+    r or c do not overflow; states beyond the capacity have probability 0.
+    """
+    import numpy as np
+
+    probabilities = np.zeros(n_max + 1)
+    if r == 0:
+        probabilities[0] = exp(logP0)
+        return probabilities
+
+    logP = probabilities
+    logP[0] = logP0
+    logP[1:] = log(r) - np.log(np.minimum(np.arange(1, n_max + 1), c))
+    np.cumsum(logP, out=logP)
+    np.exp(logP, out=probabilities)
+    if capacity < n_max:
+        probabilities[int(capacity) + 1:] = 0
+    return probabilities
+
+
+def model(lumbda, mu, numberOfServers=1, systemCapacity=inf):
+    """Builds the analytic model matching the number of servers and system capacity."""
     if numberOfServers == 1:
         if systemCapacity == inf or systemCapacity == 0:
-            MM1(lumbda, mu).display()
+            return MM1(lumbda, mu)
         else:
-            MM1K(lumbda, mu, systemCapacity).display()
+            return MM1K(lumbda, mu, systemCapacity)
     else:
         if systemCapacity == inf:
-            MMC(lumbda, mu, numberOfServers).display()
+            return MMC(lumbda, mu, numberOfServers)
         else:
-            MMCK(lumbda, mu, numberOfServers, systemCapacity).display()
-    
+            return MMCK(lumbda, mu, numberOfServers, systemCapacity)
+
+
+@lru_cache(maxsize=256)
+def solve(lumbda, mu, numberOfServers=1, systemCapacity=inf):
+    """Solves the matching analytic model and returns its Measures.
+
+    Results are kept in a bounded LRU cache keyed on (lumbda, mu, c, K); use
+    solve.cache_info() for the hit and miss counters and solve.cache_clear()
+    to empty it.
+    """
+    with phase("solve"):
+        return model(lumbda, mu, numberOfServers, systemCapacity).measures()
+
+
+def solution(lumbda, mu, numberOfServers=1, systemCapacity=inf):
+    measures = solve(lumbda, mu, numberOfServers, systemCapacity)
+    with phase("display"):
+        measures.display()
+
+
+def erlang_b(r, numberOfServers):
+    """Evaluates the Erlang-B recursion elementwise over arrays of offered load and server counts.
+
+    Runs B(k) = r B(k-1) / (k + r B(k-1)) from B(0) = 1 up to each element's c,
+    alongside log S(k) = log S(k-1) - log(1 - B(k)) for S(k) = sum(r^i / i!, i <= k),
+    using only float arithmetic. Points are ordered by c so that step k only
+    touches the points that still have servers left, for O(sum(c)) work in total.
+
+    Args:
+        r (ndarray): Offered load lumbda / mu of each point.
+        numberOfServers (ndarray): Positive integer number of servers of each point.
+
+    Returns:
+        Tuple[ndarray, ndarray]: The blocking probability B(c) and log S(c) of each point.
+    """
+    import numpy as np
+
+    r, c = np.broadcast_arrays(np.asarray(r, dtype=np.float64), np.asarray(numberOfServers, dtype=np.int64))
+    order = np.argsort(c, axis=None, kind="stable")
+    sorted_r = r.ravel()[order]
+    sorted_c = c.ravel()[order]
+
+    b = np.ones(len(order))
+    log_s = np.zeros(len(order))
+    for k in range(1, int(sorted_c[-1]) + 1 if len(order) else 1):
+        active = slice(np.searchsorted(sorted_c, k), None)
+        rb = sorted_r[active] * b[active]
+        b[active] = rb / (k + rb)
+        log_s[active] -= np.log1p(-b[active])
+
+    blocking = np.empty(len(order))
+    blocking[order] = b
+    log_sum = np.empty(len(order))
+    log_sum[order] = log_s
+    return blocking.reshape(c.shape), log_sum.reshape(c.shape)
+
+
+def log_factorials(n):
+    """Returns log(j!) for j = 0..n as an array, by a cumulative sum of logs."""
+    import numpy as np
+
+    return np.concatenate(([0.0], np.cumsum(np.log(np.arange(1, n + 1)))))
+
+
+def log_erlang_b(r, numberOfServers):
+    """Returns log B(c, r) of the Erlang-B formula for every c = 0..numberOfServers at once.
+
+    Uses B(c) = (r^c / c!) / S(c), S(c) = sum(r^i / i!, i <= c), with log S
+    accumulated over c by np.logaddexp, so the whole range costs O(c) array
+    work where erlang_b would run one recursion per number of servers.
+    """
+    import numpy as np
+
+    c = np.arange(numberOfServers + 1)
+    log_terms = c * log(r) - log_factorials(numberOfServers)
+    return log_terms - np.logaddexp.accumulate(log_terms)
+
+
+def sweep(lumbda, mu, numberOfServers=1, systemCapacity=inf):
+    """Evaluates the analytic models over whole grids of parameters in one vectorized call.
+
+    The arguments broadcast against each other like NumPy arrays; an infinite
+    capacity selects M/M/1 or M/M/c, a finite one M/M/1/K or M/M/c/K, as in
+    solution. Every point goes through the Erlang-B recursion, so c may differ
+    from point to point. Points that are invalid or unstable (lumbda >= c * mu
+    with an infinite capacity) are masked instead of raising.
+
+    Returns:
+        Dict[str, MaskedArray]: Arrays of L, Lq, W, Wq, Ru and P0.
+    """
+    import numpy as np
+
+    lumbda, mu, c, k = np.broadcast_arrays(*(np.asarray(x, dtype=np.float64) for x in
+                                             (lumbda, mu, numberOfServers, systemCapacity)))
+    # A capacity of 0 on a single server means unlimited, as in solution
+    k = np.where((c == 1) & (k == 0), inf, k)
+    finite = np.isfinite(k)
+
+    valid = (lumbda > 0) & (mu > 0) & (c >= 1) & (c == np.floor(c)) & ~np.isnan(k)
+    valid &= np.where(finite, (k >= c) & (k == np.floor(np.where(finite, k, 0))), lumbda < c * mu)
+
+    # Evaluate invalid points on harmless placeholders and mask them at the end
+    lumbda = np.where(valid, lumbda, 0.5)
+    mu = np.where(valid, mu, 1.0)
+    c = np.where(valid, c, 1).astype(np.int64)
+    waiting_room = np.where(valid & finite, k - c, 0)
+
+    r = lumbda / mu
+    ru = r / c
+    count("sweep_points", r.size)
+    with phase("erlang_b"):
+        b, log_s = erlang_b(r, c)
+
+    with np.errstate(all="ignore"):
+        # G = sum(ru^j) and H = sum(j ru^j) for j = 0..K-c, or the infinite series when K is unlimited
+        one = np.isclose(ru, 1)
+        safe_ru = np.where(one, 0.5, ru)
+        ru_m = np.where(finite, safe_ru ** waiting_room, 0)
+        g = np.where(one, waiting_room + 1, (1 - ru_m * safe_ru) / (1 - safe_ru))
+        h = np.where(one, waiting_room * (waiting_room + 1) / 2,
+                     safe_ru * (1 - (waiting_room + 1) * ru_m + waiting_room * ru_m * safe_ru) / (1 - safe_ru) ** 2)
+
+        # Probability of exactly c customers, the first state in which arrivals wait
+        denominator = 1 - b + b * g
+        p_c = b / denominator
+        p0 = np.exp(-log_s) / denominator
+        p_full = np.where(finite, p_c * np.where(one, 1, ru_m), 0)
+
+        effective = lumbda * (1 - p_full)
+        lq = p_c * h
+        l = lq + effective / mu
+        results = {"L": l, "Lq": lq, "W": l / effective, "Wq": lq / effective, "Ru": ru, "P0": p0}
+
+    return {name: np.ma.masked_array(values, mask=~valid | ~np.isfinite(values))
+            for name, values in results.items()}
+
+
+def validate(lumbda, mu, numberOfServers=1, systemCapacity=inf, num_customers=100000, seed=None):
+    """Prints the analytic measures next to the ones of a FIFO simulation of the same system."""
+    from simulation import simulate_multi
+
+    if systemCapacity == 0:
+        systemCapacity = inf
+    system = model(lumbda, mu, numberOfServers, systemCapacity)
+    result = simulate_multi(lumbda, mu, numberOfServers, systemCapacity, num_customers, seed)
+
+    simulated = result.summary()
+
+    print(f"{'':<12}{'Analytic':>14}{'Simulated':>14}")
+    print(f"{'L':<12}{system.findL():>14.6f}{simulated['L']:>14.6f}")
+    print(f"{'Lq':<12}{system.findLq():>14.6f}{simulated['Lq']:>14.6f}")
+    print(f"{'W':<12}{system.findW():>14.6f}{simulated['W']:>14.6f}")
+    print(f"{'Wq':<12}{system.findWq():>14.6f}{simulated['Wq']:>14.6f}")
+    if systemCapacity != inf:
+        print(f"{'P(block)':<12}{system.findPk(systemCapacity):>14.6f}{simulated['Pb']:>14.6f}")
+
+
           
         
 
 def ask_user():
+    from simulation import simulate, chart
+
     arrival_rate = float(input("Enter the arrival rate (lambda): "))
     service_rate = float(input("Enter the service rate (mu): "))
     servers = int(input("Enter the Number of Servers (c):"))
     capacity_input = input("Enter the system capacity (k) (leave empty for infinity): ")
     capacity = inf if capacity_input == "" else int(capacity_input)
     solution(arrival_rate, service_rate, servers, capacity)
-    simulate(arrival_rate, service_rate, 0)
-    chart()
+    result = simulate(arrival_rate, service_rate, 0)
+    chart(result)
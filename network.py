@@ -0,0 +1,268 @@
+from bisect import bisect_right
+from collections import deque
+from heapq import heappop, heappush
+
+import numpy as np
+
+from distributions import as_distribution
+from models import model, sweep
+from parameter import Measures
+from profiling import count, phase
+
+
+# Number of service times and routing draws generated at a time for each station.
+BUFFER_SIZE = 4096
+
+
+def traffic(external, routing):
+    """Validates an open network and solves lumbda = external + routing^T lumbda for the rate into every station.
+
+    Raises ValueError unless the routing matrix is square, its rows are
+    probabilities summing to at most 1, the external rates are non-negative
+    and not all zero, and I - routing^T is solvable, i.e. every customer
+    eventually leaves the network.
+    """
+    n = len(external)
+    if routing.shape != (n, n):
+        raise ValueError("Routing matrix must be square with one row per station.")
+    if np.any(routing < 0) or np.any(routing.sum(axis=1) > 1 + 1e-12):
+        raise ValueError("Routing rows must be probabilities summing to at most 1.")
+    if np.any(external < 0) or external.sum() <= 0:
+        raise ValueError("External arrival rates must be non-negative and not all zero.")
+    try:
+        rates = np.linalg.solve(np.eye(n) - routing.T, external)
+    except np.linalg.LinAlgError:
+        raise ValueError("Routing matrix traps customers in the network; some must be able to leave.") from None
+    if not np.all(np.isfinite(rates)) or np.any(rates < -1e-12):
+        raise ValueError("Routing matrix traps customers in the network; some must be able to leave.")
+    return np.maximum(rates, 0.0)
+
+
+class JacksonNetwork:
+    """
+    Represents an open Jackson network of M/M/1 and M/M/c stations.
+
+    Customers arrive from outside at station i at rate external[i], are
+    served there by numberOfServers[i] servers of rate mus[i], then move to
+    station j with probability routing[i][j] or leave with the probability
+    missing from the row.
+    """
+
+    def __init__(self, external, mus, routing, numberOfServers=1):
+        """
+        Initializes the network and solves its traffic equations.
+        """
+        self.external = np.asarray(external, dtype=np.float64)
+        n = len(self.external)
+        self.mus = np.broadcast_to(np.asarray(mus, dtype=np.float64), (n,))
+        self.numberOfServers = np.broadcast_to(np.asarray(numberOfServers, dtype=np.int64), (n,))
+        self.routing = np.asarray(routing, dtype=np.float64)
+
+        # Validate inputs
+        if np.any(self.numberOfServers <= 0):
+            raise ValueError("Number of servers must be a positive integer.")
+
+        self.rates = traffic(self.external, self.routing)
+        if np.any(self.rates >= self.mus * self.numberOfServers):
+            raise ValueError("Arrival rate must be less than service rate * number of servers at every station.")
+        self._measures = None
+
+    def station(self, i):
+        """Builds the M/M/1 or M/M/c model of station i at its solved arrival rate."""
+        return model(float(self.rates[i]), float(self.mus[i]), int(self.numberOfServers[i]))
+
+    def station_measures(self):
+        """Calculates L, Lq, W, Wq, Ru and P0 of every station in one vectorized call.
+
+        Returns:
+            Dict[str, ndarray]: One array per measure, indexed by station. A station
+            nobody visits has zero L and Lq and the bare service time as W.
+        """
+        visited = self.rates > 0
+        # sweep masks lumbda = 0, so idle stations are evaluated on a tiny rate and fixed up below
+        results = sweep(np.where(visited, self.rates, 1e-300), self.mus, self.numberOfServers)
+        results = {name: np.ma.getdata(values).copy() for name, values in results.items()}
+        for name in ("L", "Lq", "Wq", "Ru"):
+            results[name][~visited] = 0.0
+        results["W"][~visited] = 1 / self.mus[~visited]
+        results["P0"][~visited] = 1.0
+        return results
+
+    def visits(self):
+        """Returns the mean number of visits an arriving customer makes to each station."""
+        return self.rates / self.external.sum()
+
+    def measures(self):
+        """Calculates the end-to-end measures once and returns them as an immutable Measures record.
+
+        L and Lq add up over the stations and W, Wq follow from Little's law with
+        the total external arrival rate. Ru is the utilization of the bottleneck
+        station and P0 the probability that the whole network is empty, the
+        product of the station P0s by the product form of Jackson networks.
+        """
+        if self._measures is None:
+            stations = self.station_measures()
+            total = float(self.external.sum())
+            L, Lq = float(stations["L"].sum()), float(stations["Lq"].sum())
+            self._measures = Measures(L=L, Lq=Lq, W=L / total, Wq=Lq / total, Ru=float(stations["Ru"].max()),
+                                      P0=float(np.prod(stations["P0"])))
+        return self._measures
+
+    def findL(self):
+        """Calculates and returns the average number of customers in the network (L)."""
+        return self.measures().L
+
+    def findW(self):
+        """Calculates and returns the average time a customer spends in the network (W)."""
+        return self.measures().W
+
+    def display(self):
+        """Displays the measures of every station followed by the end-to-end measures."""
+        stations = self.station_measures()
+        print(f"{'Station':<10}{'lambda':>12}{'L':>12}{'Lq':>12}{'W':>12}{'Wq':>12}{'Ru':>12}")
+        for i in range(len(self.rates)):
+            print(f"{i:<10}{self.rates[i]:>12.6f}" +
+                  "".join(f"{stations[name][i]:>12.6f}" for name in ("L", "Lq", "W", "Wq", "Ru")))
+        print("End to end:")
+        self.measures().display()
+
+
+class NetworkResult:
+    """
+    Holds the end-to-end times of every customer and the per-station totals of a network simulation.
+    """
+
+    def __init__(self, arrival_times, time_in_network, visits, queue_time, busy_time, num_stations):
+        self.arrival_times = arrival_times
+        self.time_in_network = time_in_network
+        # Per station: number of visits, total time waited and total time served over all customers
+        self.visits = visits
+        self.queue_time = queue_time
+        self.busy_time = busy_time
+        self.num_stations = num_stations
+
+    def __len__(self):
+        return len(self.arrival_times)
+
+    def station_summary(self):
+        """Returns arrays of the observed arrival rate, W, Wq, L and Lq of every station.
+
+        L and Lq follow from Little's law with the observed arrival rate of each station.
+        """
+        span = self.arrival_times[-1] - self.arrival_times[0]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            wq = self.queue_time / self.visits
+            w = (self.queue_time + self.busy_time) / self.visits
+        rate = self.visits / span
+        return {"lumbda": rate, "W": w, "Wq": wq, "L": rate * w, "Lq": rate * wq}
+
+    def summary(self):
+        """Returns the end-to-end W, Wq, L and Lq of the network."""
+        span = self.arrival_times[-1] - self.arrival_times[0]
+        w = float(self.time_in_network.mean())
+        wq = float(self.queue_time.sum()) / len(self)
+        rate = len(self) / float(span)
+        return {"W": w, "Wq": wq, "L": rate * w, "Lq": rate * wq}
+
+
+def simulate_network(external, mus, routing, numberOfServers=1, num_customers=100000, seed=None):
+    """Simulates an open network of FIFO stations with c servers each and probabilistic routing.
+
+    External arrivals are Poisson; service times may follow any distribution,
+    so exponential ones give the Jackson network solved by JacksonNetwork.
+    Completions of every station share one event heap that is merged with the
+    sorted external arrivals, so the cost per event is O(log busy servers)
+    whatever the number of stations. Service times and routing draws are
+    generated in per-station buffers of BUFFER_SIZE, and the next station is
+    found by bisecting the cumulative routing row.
+
+    Args:
+        external (Sequence[float]): External arrival rate of each station.
+        mus (Sequence[float or Distribution]): Service rate or service time distribution of each station.
+        routing (array_like): routing[i][j] is the probability of moving from station i to j.
+        numberOfServers (int or Sequence[int]): Number of parallel servers of each station.
+        num_customers (int): Number of customers to admit from outside and follow until they leave.
+        seed (int or Generator, optional): Seed for the random number generator, or a numpy.random.Generator.
+
+    Returns:
+        NetworkResult: The time every customer spends in the network and the totals of every station.
+    """
+    external = np.asarray(external, dtype=np.float64)
+    n = len(external)
+    routing = np.asarray(routing, dtype=np.float64)
+    # Rejects routings that would keep customers in the network forever, before any event is simulated
+    traffic(external, routing)
+    if np.ndim(mus) == 0:
+        mus = [mus] * n
+    servers = np.broadcast_to(np.asarray(numberOfServers, dtype=np.int64), (n,)).tolist()
+
+    rng = np.random.default_rng(seed)
+    total = external.sum()
+    with phase("generate"):
+        arrival_times = np.cumsum(rng.standard_exponential(num_customers) / total)
+        entry = rng.choice(n, size=num_customers, p=external / total).tolist()
+
+    distributions = [as_distribution(mu) for mu in mus]
+    cumulative = np.cumsum(routing, axis=1).tolist()
+    service_buffers = [[] for _ in range(n)]
+    route_buffers = [[] for _ in range(n)]
+
+    def service(i):
+        buffer = service_buffers[i]
+        if not buffer:
+            buffer.extend(distributions[i].sample(rng, BUFFER_SIZE)[::-1].tolist())
+        return buffer.pop()
+
+    def route(i):
+        buffer = route_buffers[i]
+        if not buffer:
+            buffer.extend(rng.random(BUFFER_SIZE).tolist())
+        # Past the end of the row the customer leaves the network
+        return bisect_right(cumulative[i], buffer.pop())
+
+    busy = [0] * n
+    queues = [deque() for _ in range(n)]
+    visits = [0] * n
+    queue_time = [0.0] * n
+    busy_time = [0.0] * n
+    completion = [0.0] * num_customers
+    events = []  # (completion time, customer, station)
+
+    def arrive(now, customer, i):
+        visits[i] += 1
+        if busy[i] < servers[i]:
+            busy[i] += 1
+            duration = service(i)
+            busy_time[i] += duration
+            heappush(events, (now + duration, customer, i))
+        else:
+            queues[i].append((customer, now))
+
+    arrivals = arrival_times.tolist()
+    next_arrival = 0
+    with phase("network_events"):
+        while next_arrival < num_customers or events:
+            if events and (next_arrival == num_customers or events[0][0] <= arrivals[next_arrival]):
+                now, customer, i = heappop(events)
+                if queues[i]:
+                    waiting, joined = queues[i].popleft()
+                    queue_time[i] += now - joined
+                    duration = service(i)
+                    busy_time[i] += duration
+                    heappush(events, (now + duration, waiting, i))
+                else:
+                    busy[i] -= 1
+                j = route(i)
+                if j < n:
+                    arrive(now, customer, j)
+                else:
+                    completion[customer] = now
+            else:
+                arrive(arrivals[next_arrival], next_arrival, entry[next_arrival])
+                next_arrival += 1
+    count("customers", num_customers)
+    # Every external arrival and every service completion
+    count("events", num_customers + sum(visits))
+
+    return NetworkResult(arrival_times, np.array(completion) - arrival_times, np.array(visits, dtype=np.float64),
+                         np.array(queue_time), np.array(busy_time), n)
@@ -1,5 +1,43 @@
 from math import inf
-from numpy import random
+
+
+class Measures:
+    """
+    Immutable record of the performance measures of a solved queuing system.
+    """
+
+    __slots__ = ("L", "Lq", "W", "Wq", "Ru", "P0")
+
+    def __init__(self, L, Lq, W, Wq, Ru, P0):
+        for name, value in zip(self.__slots__, (L, Lq, W, Wq, Ru, P0)):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Measures are immutable.")
+
+    def __delattr__(self, name):
+        raise AttributeError("Measures are immutable.")
+
+    def __eq__(self, other):
+        return isinstance(other, Measures) and self._values() == other._values()
+
+    def __hash__(self):
+        return hash(self._values())
+
+    def __repr__(self):
+        return "Measures(" + ", ".join(f"{name}={value!r}" for name, value in zip(self.__slots__, self._values())) + ")"
+
+    def _values(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def display(self, file=None):
+        """Displays the performance measures (on stdout unless another text file is given)."""
+        print(f"L: {self.L}", file=file)
+        print(f"Lq: {self.Lq}", file=file)
+        print(f"W: {self.W}", file=file)
+        print(f"Wq: {self.Wq}", file=file)
+        print(f"Ru: {self.Ru}", file=file)
+
 
 class Params:
     """
@@ -15,22 +53,33 @@ class Params:
         self.mu = mu
         self.numberOfServers = numberOfServers
         self.systemCapacity = systemCapacity
+        self._measures = None
+
+    def measures(self):
+        """Calculates the performance measures once and returns them as an immutable Measures record."""
+        if self._measures is None:
+            self._measures = self._solve()
+        return self._measures
+
+    def _solve(self):
+        """Calculates all the performance measures in one pass and returns them as Measures."""
+        raise NotImplementedError("This method should be implemented in subclasses.")
 
     def findL(self):
         """Calculates and returns the average number of customers in the system (L)."""
-        raise NotImplementedError("This method should be implemented in subclasses.")
+        return self.measures().L
 
     def findLq(self):
         """Calculates and returns the average number of customers in the queue (Lq)."""
-        raise NotImplementedError("This method should be implemented in subclasses.")
+        return self.measures().Lq
 
     def findW(self):
         """Calculates and returns the average time a customer spends in the system (W)."""
-        raise NotImplementedError("This method should be implemented in subclasses.")
+        return self.measures().W
 
     def findWq(self):
         """Calculates and returns the average time a customer spends in the queue (Wq)."""
-        raise NotImplementedError("This method should be implemented in subclasses.")
+        return self.measures().Wq
 
     def findPk(self, k):
         """Calculates and returns the probability of having k customers in the system (Pk)."""
@@ -40,13 +89,108 @@ class Params:
         """Calculates and returns the server utilization (Ru)."""
         raise NotImplementedError("This method should be implemented in subclasses.")
 
+    def distribution(self, n_max):
+        """Calculates and returns the array of probabilities P(0), ..., P(n_max) of n customers in the system."""
+        raise NotImplementedError("This method should be implemented in subclasses.")
+
+    def cdf(self, n_max):
+        """Calculates and returns the array of probabilities P(N <= n) for n = 0, ..., n_max."""
+        import numpy as np
+
+        return np.cumsum(self.distribution(n_max))
+
+    def quantile(self, q):
+        """Calculates and returns the smallest n with P(N <= n) >= q, for a level or an array of levels.
+
+        For example quantile(0.95) is the 95th percentile of the number of
+        customers in the system. With an unlimited capacity the distribution is
+        extended by doubling until it covers the highest level asked for.
+        """
+        import numpy as np
+
+        q = np.asarray(q, dtype=np.float64)
+        finite = self.systemCapacity != inf
+        n_max = int(self.systemCapacity) if finite else max(64, 2 * int(self.numberOfServers))
+        cdf = self.cdf(n_max)
+        while not finite and cdf[-1] < q.max():
+            covered = cdf[-1]
+            n_max *= 2
+            cdf = self.cdf(n_max)
+            if cdf[-1] == covered:
+                break
+
+        n = np.minimum(np.searchsorted(cdf, q), n_max)
+        return int(n) if n.ndim == 0 else n
+
+    def _arrivals(self):
+        """Returns P(N = n) for n = 0..K-1 as seen by admitted arrivals of a finite-capacity system."""
+        probabilities = self.distribution(int(self.systemCapacity))
+        return probabilities[:-1] / (1 - probabilities[-1])
+
+    def _time_tail(self, t, sojourn):
+        """Calculates P(Wq > t) or, with sojourn, P(W > t) elementwise over an array of times t."""
+        import numpy as np
+        import waiting
+
+        t = np.asarray(t, dtype=np.float64)
+        c = self.numberOfServers
+        if self.systemCapacity != inf:
+            tail = waiting.finite_sojourn_tail if sojourn else waiting.finite_waiting_tail
+            return tail(t, self.mu, c, self._arrivals())
+        # Arrivals see the time-average distribution, so P(wait) = P(N >= c)
+        p_wait = 1 - self.distribution(c - 1).sum()
+        tail = waiting.sojourn_tail if sojourn else waiting.waiting_tail
+        return tail(t, self.lumbda, self.mu, c, p_wait)
+
+    def waiting_tail(self, t):
+        """Calculates and returns P(Wq > t), the probability of waiting longer than t in the queue.
+
+        t may be a time or an array of times, e.g. the points of a whole
+        latency curve, and the result has the same shape.
+        """
+        return _result(self._time_tail(t, sojourn=False))
+
+    def waiting_cdf(self, t):
+        """Calculates and returns P(Wq <= t) for a time or an array of times."""
+        return _result(1 - self._time_tail(t, sojourn=False))
+
+    def sojourn_tail(self, t):
+        """Calculates and returns P(W > t), the probability of spending longer than t in the system."""
+        return _result(self._time_tail(t, sojourn=True))
+
+    def sojourn_cdf(self, t):
+        """Calculates and returns P(W <= t) for a time or an array of times."""
+        return _result(1 - self._time_tail(t, sojourn=True))
+
+    def waiting_quantile(self, q):
+        """Calculates and returns the q-quantile of the time in queue for a level or an array of levels.
+
+        For example waiting_quantile([0.95, 0.99]) gives the p95 and p99 of Wq;
+        levels below the probability of not waiting give 0.
+        """
+        import waiting
+
+        return _result(waiting.tail_quantile(lambda t: self._time_tail(t, sojourn=False), q,
+                                             self.findWq() or 1 / self.mu))
+
+    def sojourn_quantile(self, q):
+        """Calculates and returns the q-quantile of the time in the system for a level or an array of levels."""
+        import waiting
+
+        return _result(waiting.tail_quantile(lambda t: self._time_tail(t, sojourn=True), q, self.findW()))
+
     def display(self):
         """Displays the calculated performance measures."""
-        print(f" L = {self.findL()} \n Lq = {self.findLq()} \n W = {self.findW()} \n Wq = {self.findWq()}")
+        self.measures().display()
 
      
 
          
         
 
-        
\ No newline at end of file
+        
+
+
+def _result(values):
+    """Returns a 0-d array as a float and any other array unchanged."""
+    return float(values) if values.ndim == 0 else values
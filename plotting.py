@@ -0,0 +1,38 @@
+import matplotlib.pyplot as plt
+
+from simulation import chart_timeline
+
+
+def chart(result, buckets=2000):
+    """Plots the number of customers in the system over time from a SimulationResult.
+
+    The timeline is reduced to at most a few points per horizontal bucket
+    before plotting, and the title reports the time-average L of the full
+    timeline.
+    """
+    plot_timeline(*chart_timeline(result, buckets))
+
+
+def plot_timeline(time_points, customer_count, average):
+    """Plots a timeline computed by simulation.chart_timeline."""
+    plt.figure(figsize=(10, 6))
+    plt.step(time_points, customer_count, where='post')  # Use step plot for discrete events
+    plt.xlabel("Time")
+    plt.ylabel("Number of Customers in System")
+    plt.title(f"Customer Count Over Time (time-average L = {average:.2f})")
+    plt.grid(True)
+    plt.show()
+
+
+def transient_chart(result):
+    """Plots the mean number of customers L(t) and the blocking probability P(K, t) from a TransientResult."""
+    figure, (mean_axis, blocking_axis) = plt.subplots(2, 1, sharex=True, figsize=(10, 6))
+    mean_axis.plot(result.times, result.mean())
+    mean_axis.set_ylabel("Mean Number of Customers L(t)")
+    mean_axis.grid(True)
+    blocking_axis.plot(result.times, result.blocking())
+    blocking_axis.set_xlabel("Time")
+    blocking_axis.set_ylabel("Blocking Probability P(K, t)")
+    blocking_axis.grid(True)
+    figure.suptitle("Transient Behaviour")
+    plt.show()
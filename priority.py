@@ -0,0 +1,299 @@
+from collections import deque
+from heapq import heappop, heappush
+from itertools import count as count_from
+from math import inf
+
+import numpy as np
+
+from distributions import as_distribution
+from models import MMC
+from parameter import Measures
+from profiling import count, phase
+
+
+class IndexedHeap:
+    """
+    Binary min-heap of a fixed set of slots (0..n-1) keyed by floats.
+
+    Each slot knows its position in the heap, so the key of any slot can be
+    changed in O(log n) without searching for it; that is how a server is
+    re-keyed when the class it serves changes. Idle slots are keyed by inf.
+    """
+
+    def __init__(self, size):
+        self.keys = [inf] * size
+        self.heap = list(range(size))
+        self.position = list(range(size))
+
+    def top(self):
+        """Returns the slot with the smallest key and that key."""
+        slot = self.heap[0]
+        return slot, self.keys[slot]
+
+    def update(self, slot, key):
+        """Sets the key of a slot and restores the heap order around it."""
+        keys, heap, position = self.keys, self.heap, self.position
+        old = keys[slot]
+        keys[slot] = key
+        i = position[slot]
+        if key < old:
+            while i:
+                parent = (i - 1) >> 1
+                other = heap[parent]
+                if keys[other] <= key:
+                    break
+                heap[i] = other
+                position[other] = i
+                i = parent
+        else:
+            size = len(heap)
+            while True:
+                child = 2 * i + 1
+                if child >= size:
+                    break
+                if child + 1 < size and keys[heap[child + 1]] < keys[heap[child]]:
+                    child += 1
+                other = heap[child]
+                if keys[other] >= key:
+                    break
+                heap[i] = other
+                position[other] = i
+                i = child
+        heap[i] = slot
+        position[slot] = i
+
+
+class PriorityResult:
+    """
+    Holds the per-customer columns of a multi-class priority simulation, in order of arrival.
+    """
+
+    def __init__(self, classes, arrival_times, service_times, time_in_queue, num_classes):
+        self.classes = classes
+        self.arrival_times = arrival_times
+        self.service_times = service_times
+        # Time not spent in service, including time preempted under the preemptive discipline
+        self.time_in_queue = time_in_queue
+        self.num_classes = num_classes
+
+    def __len__(self):
+        return len(self.arrival_times)
+
+    @property
+    def time_in_system(self):
+        """Time each customer spends waiting plus being served."""
+        return self.time_in_queue + self.service_times
+
+    def summary(self):
+        """Returns one dict of W, Wq, L and Lq per class, highest priority first.
+
+        L and Lq follow from Little's law with the observed arrival rate of each class.
+        """
+        span = self.arrival_times[-1] - self.arrival_times[0]
+        summaries = []
+        for k in range(self.num_classes):
+            mine = self.classes == k
+            wq = float(self.time_in_queue[mine].mean())
+            w = wq + float(self.service_times[mine].mean())
+            rate = np.count_nonzero(mine) / span
+            summaries.append({"W": w, "Wq": wq, "L": rate * w, "Lq": rate * wq})
+        return summaries
+
+
+def _arrivals(lumbdas, rng, num_customers):
+    """Draws the arrivals of every class and returns the first num_customers overall, in time order."""
+    distributions = [as_distribution(lumbda) for lumbda in lumbdas]
+    rates = np.array([1 / distribution.mean for distribution in distributions])
+    streams = [np.cumsum(distribution.sample(rng, int(num_customers * rate / rates.sum() * 1.2) + 16))
+               for distribution, rate in zip(distributions, rates)]
+
+    while True:
+        times = np.concatenate(streams)
+        classes = np.repeat(np.arange(len(streams)), [len(stream) for stream in streams])
+        order = np.argsort(times, kind="stable")[:num_customers]
+        cutoff = times[order[-1]]
+        # Every class must have been drawn past the cutoff, or some of its arrivals are missing
+        short = [k for k, stream in enumerate(streams) if stream[-1] < cutoff]
+        if not short:
+            return times[order], classes[order]
+        for k in short:
+            extra = distributions[k].sample(rng, len(streams[k]))
+            streams[k] = np.concatenate((streams[k], streams[k][-1] + np.cumsum(extra)))
+
+
+def simulate_priority(lumbdas, mus, numberOfServers=1, preemptive=False, num_customers=100000, seed=None):
+    """Simulates a multi-class priority queue with c servers.
+
+    Class 0 has the highest priority; within a class customers are served
+    FIFO. Without preemption a customer in service always finishes; with
+    preemption (preemptive-resume) an arrival takes the server of the
+    lowest-priority customer in service if that customer's class is lower,
+    and the preempted customer goes back to its class queue, ahead of every
+    customer of its class that arrived after it, with its remaining service
+    time. Departures live in a heapq where a preemption pushes the server's
+    new departure and the one it supersedes is skipped once it surfaces, an
+    IndexedHeap keyed by the negated class in service yields the preemption
+    victim in O(log c), and the highest class with anyone waiting is found
+    from a bitmask of non-empty queues.
+
+    Args:
+        lumbdas (Sequence[float or Distribution]): Arrival rate or interarrival time distribution of each class.
+        mus (Sequence[float or Distribution]): Service rate or service time distribution of each class.
+        numberOfServers (int): Number of parallel servers (c).
+        preemptive (bool): Preemptive-resume instead of non-preemptive priority.
+        num_customers (int): Number of customers to simulate over all classes.
+        seed (int or Generator, optional): Seed for the random number generator, or a numpy.random.Generator.
+
+    Returns:
+        PriorityResult: The class, arrival time, service time and time in queue of every customer.
+    """
+    if len(lumbdas) != len(mus):
+        raise ValueError("Every class needs an arrival and a service rate.")
+    if numberOfServers <= 0:
+        raise ValueError("Number of servers must be a positive integer.")
+
+    rng = np.random.default_rng(seed)
+    with phase("generate"):
+        arrival_times, classes = _arrivals(lumbdas, rng, num_customers)
+        service_times = np.empty(num_customers)
+        for k, mu in enumerate(mus):
+            mine = classes == k
+            service_times[mine] = as_distribution(mu).sample(rng, np.count_nonzero(mine))
+
+    arrivals, customer_class = arrival_times.tolist(), classes.tolist()
+    remaining = service_times.tolist()
+    completion = [0.0] * num_customers
+
+    # Departures as (time, ticket, server). A preemption pushes the server's new departure under a new ticket,
+    # and the entry it supersedes is skipped when it reaches the top instead of being searched for.
+    departures = []
+    tickets = [0] * numberOfServers
+    issued = count_from(1)
+    # Keyed by minus the class in service, so the top is the lowest-priority customer; idle servers are keyed by inf.
+    # Only needed to pick preemption victims, and only re-keyed when the class in service changes.
+    victims = IndexedHeap(numberOfServers)
+    victim, rekey = victims.top, victims.update
+    serving = [-1] * numberOfServers
+    free = list(range(numberOfServers - 1, -1, -1))
+    queues = [deque() for _ in lumbdas]
+    # Preempted customers of each class, by arrival order. They all arrived before anyone in the class queue,
+    # who only started waiting while they were in service, so they are served first.
+    resumed = [[] for _ in lumbdas]
+    waiting = 0  # Bit k is set while class k has customers waiting
+    started = [0.0] * numberOfServers
+
+    preemptions = 0
+    with phase("priority_events"):
+        # An arrival at inf after the last customer drains the departures still due
+        for customer, now in enumerate(arrivals + [inf]):
+            while departures and departures[0][0] <= now:
+                time, ticket, server = heappop(departures)
+                if ticket != tickets[server]:
+                    continue
+                done = serving[server]
+                completion[done] = time
+                if waiting:
+                    k = (waiting & -waiting).bit_length() - 1
+                    queue, preempted = queues[k], resumed[k]
+                    successor = heappop(preempted) if preempted else queue.popleft()
+                    if not queue and not preempted:
+                        waiting &= ~(1 << k)
+                    serving[server] = successor
+                    started[server] = time
+                    tickets[server] = ticket = next(issued)
+                    heappush(departures, (time + remaining[successor], ticket, server))
+                    if preemptive and k != customer_class[done]:
+                        rekey(server, -k)
+                else:
+                    serving[server] = -1
+                    free.append(server)
+                    if preemptive:
+                        rekey(server, inf)
+            if customer == num_customers:
+                break
+
+            k = customer_class[customer]
+            if free:
+                server = free.pop()
+            else:
+                server = -1
+                if preemptive:
+                    candidate, key = victim()
+                    if -key > k:
+                        server = candidate
+                        preempted = serving[server]
+                        remaining[preempted] -= now - started[server]
+                        victim_class = customer_class[preempted]
+                        heappush(resumed[victim_class], preempted)
+                        waiting |= 1 << victim_class
+                        preemptions += 1
+                if server < 0:
+                    queues[k].append(customer)
+                    waiting |= 1 << k
+                    continue
+            serving[server] = customer
+            started[server] = now
+            tickets[server] = ticket = next(issued)
+            heappush(departures, (now + remaining[customer], ticket, server))
+            if preemptive:
+                rekey(server, -k)
+    count("customers", num_customers)
+    # Every arrival and every departure, plus the superseded departures of preempted customers
+    count("events", 2 * num_customers + preemptions)
+
+    time_in_queue = np.array(completion) - arrival_times - service_times
+    return PriorityResult(classes, arrival_times, service_times, time_in_queue, len(lumbdas))
+
+
+def solve_priority(lumbdas, mus, numberOfServers=1, preemptive=False):
+    """Solves an M/M/1 or M/M/c priority queue and returns the Measures of each class, highest priority first.
+
+    Non-preemptive (Cobham): Wq_k = W0 / ((1 - s_(k-1)) (1 - s_k)), s_k the load
+    of classes 0..k, with W0 = sum(lumbda_i / mu_i^2) on one server and
+    W0 = C(c, r) / (c mu) on c servers of equal rate, C the Erlang C formula
+    of the total load (as in MMC).
+
+    Preemptive-resume: on one server W_k = (1 / mu_k) / (1 - s_(k-1)) +
+    sum(lumbda_i / mu_i^2, i <= k) / ((1 - s_(k-1)) (1 - s_k)). On c servers of
+    equal rate classes 0..k together form an M/M/c queue, so W_k follows from
+    the MMC waiting times of classes 0..k and 0..k-1 through Little's law.
+
+    Every class shares the P0 of the whole system; Ru is the utilization due to that class.
+    """
+    lumbdas = np.asarray(lumbdas, dtype=np.float64)
+    mus = np.asarray(mus, dtype=np.float64)
+    c = numberOfServers
+    loads = lumbdas / (c * mus)
+    cumulative = np.cumsum(loads)
+    if cumulative[-1] >= 1:
+        raise ValueError("Total utilization must be less than 1 for stability.")
+    before = np.concatenate(([0.0], cumulative[:-1]))
+
+    if c == 1:
+        P0 = 1 - cumulative[-1]
+        residual = np.cumsum(lumbdas / mus ** 2)
+        if preemptive:
+            W = (1 / mus) / (1 - before) + residual / ((1 - before) * (1 - cumulative))
+            Wq = W - 1 / mus
+        else:
+            Wq = residual[-1] / ((1 - before) * (1 - cumulative))
+            W = Wq + 1 / mus
+    else:
+        if not np.all(mus == mus[0]):
+            raise ValueError("M/M/c priority queues need the same service rate for every class.")
+        mu = float(mus[0])
+        total = MMC(float(lumbdas.sum()), mu, c)
+        P0 = total.P0
+        if preemptive:
+            # Sum of lumbda_i W_i over classes 0..k, from the M/M/c queue of those classes
+            served = np.cumsum(lumbdas)
+            work = np.array([rate * MMC(rate, mu, c).findW() for rate in served])
+            W = np.diff(work, prepend=0.0) / lumbdas
+            Wq = W - 1 / mu
+        else:
+            erlangC = total.findWq() * (c * mu - lumbdas.sum())
+            Wq = erlangC / (c * mu * (1 - before) * (1 - cumulative))
+            W = Wq + 1 / mu
+
+    return [Measures(L=float(rate * w), Lq=float(rate * wq), W=float(w), Wq=float(wq), Ru=float(load), P0=float(P0))
+            for rate, w, wq, load in zip(lumbdas, W, Wq, loads)]
@@ -0,0 +1,185 @@
+import os
+import sys
+import threading
+from contextlib import contextmanager, nullcontext
+from time import perf_counter_ns
+
+
+# Returned by phase() while profiling is off, so an instrumented block costs one call and one global lookup.
+_DISABLED = nullcontext()
+
+# The Profile collecting phases and counters, None while profiling is off.
+_active = None
+
+
+class _Timer:
+    """
+    Times one pass through a phase and adds it to its Profile on exit.
+    """
+
+    __slots__ = ("profile", "name", "start")
+
+    def __init__(self, profile, name):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self):
+        self.start = perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profile.add(self.name, self.start, perf_counter_ns() - self.start)
+        return False
+
+
+class Profile:
+    """
+    Per-phase wall times and event counters collected while profiling is enabled.
+
+    Phases are named blocks of the hot paths (variate generation, the Lindley
+    recursion, table rendering, ...); each keeps its number of calls and its
+    total and longest time. Counters count work such as customers simulated
+    and events processed. With trace=True every pass through a phase is also
+    kept, for chrome_trace(). Phases may be entered from several threads,
+    e.g. the GUI worker, and nest freely.
+    """
+
+    def __init__(self, trace=False):
+        self.trace = trace
+        self.phases = {}  # name -> [calls, total ns, longest ns]
+        self.counters = {}
+        self.events = []  # (name, start ns, duration ns, thread id) when tracing
+        self.started = perf_counter_ns()
+        self.stopped = None
+        self._cache = self._cache_end = _cache_info()
+        self._lock = threading.Lock()
+
+    def phase(self, name):
+        """Returns a context manager timing the block it wraps as one call of the phase name."""
+        return _Timer(self, name)
+
+    def add(self, name, start, duration):
+        """Records one call of the phase name that began at start and lasted duration, in nanoseconds."""
+        with self._lock:
+            phase = self.phases.get(name)
+            if phase is None:
+                self.phases[name] = [1, duration, duration]
+            else:
+                phase[0] += 1
+                phase[1] += duration
+                if duration > phase[2]:
+                    phase[2] = duration
+            if self.trace:
+                self.events.append((name, start, duration, threading.get_ident()))
+
+    def count(self, name, n=1):
+        """Adds n to the counter name."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def stop(self):
+        """Ends the profile, fixing its wall time and the models.solve cache hits and misses it saw."""
+        if self.stopped is None:
+            self.stopped = perf_counter_ns()
+            self._cache_end = _cache_info()
+
+    def stats(self):
+        """Returns the profile as plain data.
+
+        Returns:
+            Dict: "wall_seconds", "phases" mapping each phase to its calls, total
+            and max seconds, and "counters" mapping each counter to its value.
+        """
+        if self.stopped is None:
+            end, (hits, misses) = perf_counter_ns(), _cache_info()
+        else:
+            end, (hits, misses) = self.stopped, self._cache_end
+        with self._lock:
+            phases = {name: {"calls": calls, "seconds": total / 1e9, "max_seconds": longest / 1e9}
+                      for name, (calls, total, longest) in self.phases.items()}
+            counters = dict(self.counters)
+        counters["solve_cache_hits"] = hits - self._cache[0]
+        counters["solve_cache_misses"] = misses - self._cache[1]
+        return {"wall_seconds": (end - self.started) / 1e9, "phases": phases, "counters": counters}
+
+    def display(self, file=None):
+        """Prints the phases, longest total first, and the counters (on stdout unless another text file is given)."""
+        stats = self.stats()
+        print(f"Profile over {stats['wall_seconds']:.3f} s", file=file)
+        print(f"{'Phase':<20}{'Calls':>10}{'Total (s)':>14}{'Max (s)':>14}", file=file)
+        for name, phase in sorted(stats["phases"].items(), key=lambda item: -item[1]["seconds"]):
+            print(f"{name:<20}{phase['calls']:>10}{phase['seconds']:>14.6f}{phase['max_seconds']:>14.6f}", file=file)
+        for name, value in sorted(stats["counters"].items()):
+            print(f"{name}: {value}", file=file)
+
+    def chrome_trace(self, path):
+        """Writes the traced phases and the final counters as a Chrome trace (chrome://tracing, Perfetto) JSON file."""
+        import json
+
+        pid = os.getpid()
+        with self._lock:
+            events = [{"name": name, "ph": "X", "ts": (start - self.started) / 1e3, "dur": duration / 1e3,
+                       "pid": pid, "tid": thread} for name, start, duration, thread in self.events]
+        stats = self.stats()
+        end = stats["wall_seconds"] * 1e6
+        events.extend({"name": name, "ph": "C", "ts": end, "pid": pid, "args": {name: value}}
+                      for name, value in stats["counters"].items())
+        with open(path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms", "otherData": stats}, file)
+
+
+def _cache_info():
+    """Returns the hits and misses of the models.solve cache so far, zeros if models is not loaded."""
+    models = sys.modules.get("models")
+    if models is None:
+        return 0, 0
+    info = models.solve.cache_info()
+    return info.hits, info.misses
+
+
+def enable(trace=False):
+    """Starts collecting into a new Profile and returns it. With trace=True every phase call is kept for chrome_trace."""
+    global _active
+    _active = Profile(trace)
+    return _active
+
+
+def disable():
+    """Stops collecting and returns the finished Profile, or None if profiling was off."""
+    global _active
+    profile, _active = _active, None
+    if profile is not None:
+        profile.stop()
+    return profile
+
+
+def active():
+    """Returns the Profile being collected, or None while profiling is off."""
+    return _active
+
+
+def phase(name):
+    """Returns a context manager timing the wrapped block as the phase name, or a shared no-op while profiling is off."""
+    profile = _active
+    return _DISABLED if profile is None else _Timer(profile, name)
+
+
+def count(name, n=1):
+    """Adds n to the counter name while profiling is on."""
+    profile = _active
+    if profile is not None:
+        profile.count(name, n)
+
+
+@contextmanager
+def profiled(trace=False):
+    """Collects a Profile over the with block and yields it; it is complete once the block exits.
+
+    Only work done in this process is seen, not that of the worker processes of replicate or run_batch.
+    """
+    profile = enable(trace)
+    try:
+        yield profile
+    finally:
+        if _active is profile:
+            disable()
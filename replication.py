@@ -0,0 +1,214 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from math import inf
+
+import numpy as np
+
+from simulation import PERCENTILES, SKETCH_ACCURACY, simulate_multi, simulate_variates
+from stats import DDSketch, confidence_interval, t_quantile
+
+
+# Measures returned by every replication, in column order.
+MEASURES = ("W", "Wq", "L", "Lq")
+
+
+class ReplicationResult:
+    """
+    Holds the per-replication summaries of a replicated simulation and their confidence intervals,
+    along with sketches of the waiting and sojourn times of every customer of every replication.
+    """
+
+    def __init__(self, samples, confidence, sketches=None):
+        self.samples = samples
+        self.confidence = confidence
+        self.sketches = sketches
+        self.means, self.half_widths = confidence_interval(samples, confidence)
+
+    def __len__(self):
+        return len(self.samples)
+
+    def interval(self, measure):
+        """Returns the (low, high) confidence interval of a measure such as "W"."""
+        i = MEASURES.index(measure)
+        return float(self.means[i] - self.half_widths[i]), float(self.means[i] + self.half_widths[i])
+
+    def quantile(self, measure, q):
+        """Returns the estimated q-quantile of "W" or "Wq" over all customers of all replications."""
+        return self.sketches[measure].quantile(q)
+
+    def display(self):
+        print(f"Replications: {len(self)} ({self.confidence:.0%} confidence)")
+        for measure, mean, half_width in zip(MEASURES, self.means, self.half_widths):
+            print(f"{measure}: {mean} ± {half_width}")
+        if self.sketches is not None:
+            for percentile in PERCENTILES:
+                print(f"p{percentile * 100:g} Wq: {self.quantile('Wq', percentile)}, W: {self.quantile('W', percentile)}")
+
+
+def _batches(seeds, processes):
+    """Splits the replication seeds into a few consecutive batches per worker process."""
+    bounds = np.linspace(0, len(seeds), min(processes * 4, len(seeds)) + 1).astype(int)
+    return [seeds[start:stop] for start, stop in zip(bounds[:-1], bounds[1:])]
+
+
+def _run_replications(lumbda, mu, numberOfServers, systemCapacity, num_customers, seeds):
+    """Runs one replication per seed and returns their summaries, one row each, and merged W and Wq sketches."""
+    rows = np.empty((len(seeds), len(MEASURES)))
+    sketches = {"W": DDSketch(SKETCH_ACCURACY), "Wq": DDSketch(SKETCH_ACCURACY)}
+    for i, seed in enumerate(seeds):
+        result = simulate_multi(lumbda, mu, numberOfServers, systemCapacity, num_customers, seed)
+        summary = result.summary()
+        rows[i] = [summary[measure] for measure in MEASURES]
+        # Blocked customers have NaN times
+        admitted = ~np.isnan(result.time_in_queue)
+        sketches["Wq"].update(result.time_in_queue[admitted])
+        sketches["W"].update(result.time_in_system[admitted])
+    return rows, sketches
+
+
+def replicate(lumbda, mu, numberOfServers=1, systemCapacity=inf, num_customers=10000,
+              replications=100, seed=None, processes=None, confidence=0.95):
+    """Runs independent replications of an M/M/c/K simulation across a process pool.
+
+    Every replication draws from its own stream spawned from a single
+    SeedSequence, so results are reproducible for a given seed regardless of
+    the number of processes. Replications are handed to the workers in a few
+    batches per process, and only the summaries travel back to the parent.
+
+    Args:
+        lumbda (float): Arrival rate.
+        mu (float): Service rate of each server.
+        numberOfServers (int): Number of parallel servers (c).
+        systemCapacity (int): Maximum number of customers in the system (K).
+        num_customers (int): Number of arriving customers per replication.
+        replications (int): Number of independent replications.
+        seed (int, optional): Root seed of the replication streams.
+        processes (int, optional): Worker processes, defaults to the CPU count. 1 runs in-process.
+        confidence (float): Two-sided confidence level of the intervals.
+
+    Returns:
+        ReplicationResult: Means and confidence intervals of W, Wq, L and Lq, and
+        sketches of the W and Wq of every admitted customer.
+    """
+    if replications <= 0:
+        raise ValueError("Number of replications must be a positive integer.")
+
+    seeds = np.random.SeedSequence(seed).spawn(replications)
+    processes = min(processes or os.cpu_count() or 1, replications)
+    config = (lumbda, mu, numberOfServers, systemCapacity, num_customers)
+
+    if processes == 1:
+        samples, sketches = _run_replications(*config, seeds)
+    else:
+        batches = _batches(seeds, processes)
+        with ProcessPoolExecutor(processes) as pool:
+            futures = [pool.submit(_run_replications, *config, batch) for batch in batches]
+            results = [future.result() for future in futures]
+        samples = np.concatenate([rows for rows, _ in results])
+        # Sketches merge exactly, so the percentiles do not depend on the batching
+        sketches = results[0][1]
+        for _, batch_sketches in results[1:]:
+            for measure, sketch in batch_sketches.items():
+                sketches[measure].merge(sketch)
+
+    return ReplicationResult(samples, confidence, sketches)
+
+
+class ComparisonResult:
+    """
+    Holds the per-replication summaries of several configurations simulated with common random numbers,
+    and the confidence intervals of their paired differences from the first configuration.
+    """
+
+    def __init__(self, configurations, samples, confidence):
+        self.configurations = configurations
+        # One row per replication, one column per configuration, one layer per measure
+        self.samples = samples
+        self.confidence = confidence
+        self.means, self.half_widths = confidence_interval(samples, confidence)
+        self.differences = samples[:, 1:] - samples[:, :1]
+        self.difference_means, self.difference_half_widths = confidence_interval(self.differences, confidence)
+
+    def __len__(self):
+        return len(self.samples)
+
+    def difference(self, j, measure):
+        """Returns the (low, high) confidence interval of measure of configuration j minus the first one."""
+        i = MEASURES.index(measure)
+        mean, half_width = self.difference_means[j - 1, i], self.difference_half_widths[j - 1, i]
+        return float(mean - half_width), float(mean + half_width)
+
+    def independent_half_width(self, j, measure):
+        """Returns the half-width the difference would have if both configurations were simulated independently."""
+        i = MEASURES.index(measure)
+        n = len(self)
+        variance = self.samples[:, j, i].var(ddof=1) + self.samples[:, 0, i].var(ddof=1)
+        return float(t_quantile(0.5 + self.confidence / 2, n - 1) * np.sqrt(variance / n))
+
+    def display(self, measure="W"):
+        print(f"Replications: {len(self)} ({self.confidence:.0%} confidence, common random numbers)")
+        i = MEASURES.index(measure)
+        for j, configuration in enumerate(self.configurations):
+            print(f"{configuration}: {measure} = {self.means[j, i]} ± {self.half_widths[j, i]}")
+        for j in range(1, len(self.configurations)):
+            print(f"{self.configurations[j]} - {self.configurations[0]}: {measure} difference = "
+                  f"{self.difference_means[j - 1, i]} ± {self.difference_half_widths[j - 1, i]} "
+                  f"(± {self.independent_half_width(j, measure)} if independent)")
+
+
+def _run_common(configurations, num_customers, seeds):
+    """Runs every configuration on the same variates for each seed; returns a (seed, configuration, measure) array."""
+    samples = np.empty((len(seeds), len(configurations), len(MEASURES)))
+    for r, seed in enumerate(seeds):
+        # One block of uniforms per replication, turned into unit exponentials by inversion and
+        # scaled to the rates of each configuration
+        exponentials = -np.log1p(-np.random.default_rng(seed).random((2, num_customers)))
+        for j, (lumbda, mu, numberOfServers, systemCapacity) in enumerate(configurations):
+            summary = simulate_variates(exponentials[0] / lumbda, exponentials[1] / mu,
+                                        numberOfServers, systemCapacity).summary()
+            samples[r, j] = [summary[measure] for measure in MEASURES]
+    return samples
+
+
+def compare(configurations, num_customers=10000, replications=30, seed=None, processes=None, confidence=0.95):
+    """Compares M/M/c/K configurations, e.g. c = 4 against c = 5, with common random numbers.
+
+    In every replication all configurations see the same block of uniforms,
+    so the same customers arrive and ask for the same work, scaled to each
+    configuration's rates. Their results are positively correlated and the
+    paired differences from the first configuration have much narrower
+    confidence intervals than independent runs would give. Replications are
+    spread over a process pool as in replicate and are reproducible for a
+    given seed regardless of the number of processes.
+
+    Args:
+        configurations (Sequence[tuple]): (lumbda, mu[, numberOfServers[, systemCapacity]]) of each
+            configuration; the first one is the baseline.
+        num_customers (int): Number of arriving customers per replication.
+        replications (int): Number of replications, each shared by all configurations.
+        seed (int, optional): Root seed of the replication streams.
+        processes (int, optional): Worker processes, defaults to the CPU count. 1 runs in-process.
+        confidence (float): Two-sided confidence level of the intervals.
+
+    Returns:
+        ComparisonResult: Means and confidence intervals of W, Wq, L and Lq of every
+        configuration and of their differences from the baseline.
+    """
+    if replications <= 1:
+        raise ValueError("Comparing configurations needs at least two replications.")
+    if len(configurations) < 2:
+        raise ValueError("At least two configurations are needed for a comparison.")
+    configurations = [tuple(configuration) + (1, inf)[len(configuration) - 2:] for configuration in configurations]
+
+    seeds = np.random.SeedSequence(seed).spawn(replications)
+    processes = min(processes or os.cpu_count() or 1, replications)
+
+    if processes == 1:
+        samples = _run_common(configurations, num_customers, seeds)
+    else:
+        with ProcessPoolExecutor(processes) as pool:
+            futures = [pool.submit(_run_common, configurations, num_customers, batch)
+                       for batch in _batches(seeds, processes)]
+            samples = np.concatenate([future.result() for future in futures])
+
+    return ComparisonResult(configurations, samples, confidence)
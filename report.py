@@ -0,0 +1,62 @@
+import os
+
+import numpy as np
+from tabulate import tabulate
+
+
+TABLE_HEADERS = ["Customer", "Arrival Time", "Service Begin Time", "Service Time", "Service End Time",
+                 "Time in Queue", "Time in System"]
+
+# Rows formatted per string operation when exporting CSV
+EXPORT_CHUNK_SIZE = 1 << 16
+
+
+def table_columns(result):
+    """Returns the per-customer columns of a SimulationResult in TABLE_HEADERS order."""
+    return [np.arange(1, len(result) + 1), result.arrival_times, result.start_service_times,
+            result.service_times, result.completion_times, result.time_in_queue, result.time_in_system]
+
+
+def print_table(result, rows=None):
+    """Prints the per-customer columns of a SimulationResult as a table.
+
+    When rows is given and the run has more than 2 * rows customers, only the
+    first and last rows customers are printed, so the table stays a preview.
+    """
+    columns = table_columns(result)
+    num_customers = len(result)
+
+    if rows is None or num_customers <= 2 * rows:
+        table_data = np.column_stack(columns)
+    else:
+        index = np.r_[0:rows, num_customers - rows:num_customers]
+        table_data = np.column_stack([column[index] for column in columns]).tolist()
+        # An all-missing row marks the skipped customers and keeps the columns numeric
+        table_data.insert(rows, [None] * len(columns))
+
+    # Use tabulate to format the output
+    print(tabulate(table_data, headers=TABLE_HEADERS, tablefmt="fancy_grid", missingval="..."))
+
+
+def export_table(result, path):
+    """Writes every customer row of a SimulationResult to a file, without tabulate.
+
+    A .csv file gets a header line and the rows formatted a chunk at a time;
+    a .npz file gets one binary array per column, named after the headers in
+    snake_case (e.g. time_in_queue).
+    """
+    columns = table_columns(result)
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension == ".csv":
+        row_format = "%d" + ",%.17g" * (len(columns) - 1) + "\n"
+        with open(path, "w", newline="") as file:
+            file.write(",".join(TABLE_HEADERS) + "\n")
+            for start in range(0, len(result), EXPORT_CHUNK_SIZE):
+                chunk = np.column_stack([column[start:start + EXPORT_CHUNK_SIZE] for column in columns])
+                file.write((row_format * len(chunk)) % tuple(chunk.ravel().tolist()))
+    elif extension == ".npz":
+        np.savez(path, **{header.lower().replace(" ", "_"): column
+                          for header, column in zip(TABLE_HEADERS, columns)})
+    else:
+        raise ValueError(f"Unsupported export file type: {extension}")
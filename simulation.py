@@ -1,162 +1,658 @@
-from numpy import random
-from tabulate import tabulate
-import matplotlib.pyplot as plt
+from array import array
+from heapq import heappop, heappush, heapreplace
+from math import inf
 
+import numpy as np
 
-completion_times, arrival_times = [], []
+from distributions import as_distribution
+from profiling import count, phase
+from stats import RunningStats
 
-def simulate(lumbda, mu, num_customers=0):
+
+# Number of customers pushed through the Lindley recursion at a time.
+BLOCK_SIZE = 1 << 20
+
+# Number of customers generated at a time by the streaming simulation, a few MB of working memory.
+STREAM_CHUNK_SIZE = 1 << 16
+
+# Number of customers printed from each end of a run by simulate.
+PREVIEW_ROWS = 10
+
+# Percentiles of the waiting and sojourn times reported by the streaming simulations,
+# estimated with sketches of this relative accuracy.
+PERCENTILES = (0.5, 0.9, 0.99, 0.999)
+SKETCH_ACCURACY = 0.01
+
+
+class SimulationResult:
+    """
+    Holds the per-customer columns of a simulation run.
+
+    Only the generated variates, the arrival times and the waiting times are
+    stored; the remaining columns are derived from them on access.
+    """
+
+    def __init__(self, interarrival_times, service_times, arrival_times, time_in_queue, blocked=None):
+        self.interarrival_times = interarrival_times
+        self.service_times = service_times
+        self.arrival_times = arrival_times
+        self.time_in_queue = time_in_queue
+        # Mask of customers turned away by a full system, None when capacity is unlimited
+        self.blocked = blocked
+
+    def __len__(self):
+        return len(self.arrival_times)
+
+    @property
+    def start_service_times(self):
+        """Time each customer begins service."""
+        return self.arrival_times + self.time_in_queue
+
+    @property
+    def completion_times(self):
+        """Time each customer leaves the system."""
+        return self.start_service_times + self.service_times
+
+    @property
+    def time_in_system(self):
+        """Time each customer spends waiting plus being served."""
+        return self.time_in_queue + self.service_times
+
+    @property
+    def server_idle_times(self):
+        """Time the server sat idle just before each customer arrived (single server only)."""
+        idle = np.zeros(len(self))
+        if len(self) > 1:
+            previous_end = self.arrival_times[:-1] + self.time_in_queue[:-1] + self.service_times[:-1]
+            np.maximum(self.arrival_times[1:] - previous_end, 0, out=idle[1:])
+        return idle
+
+    @property
+    def blocking_probability(self):
+        """Fraction of arriving customers turned away because the system was full."""
+        if self.blocked is None or not len(self):
+            return 0.0
+        return float(self.blocked.mean())
+
+    def summary(self):
+        """Returns the mean measures of the run as a dict with keys W, Wq, L, Lq and Pb.
+
+        L and Lq follow from Little's law with the observed rate of admitted customers.
+        """
+        admitted = ~self.blocked if self.blocked is not None else slice(None)
+        wq = float(self.time_in_queue[admitted].mean())
+        w = wq + float(self.service_times[admitted].mean())
+        throughput = (1 - self.blocking_probability) * len(self) / self.arrival_times[-1]
+        return {"W": w, "Wq": wq, "L": throughput * w, "Lq": throughput * wq,
+                "Pb": self.blocking_probability}
+
+
+class SimulationCancelled(Exception):
+    """Raised when a simulation is stopped through its cancel event."""
+
+
+def _lindley_block(interarrival, service, wait, previous_service, out):
+    """Solves one block of the Lindley recursion into out and returns the carried state.
+
+    The block is solved in closed form as W[i] = X[i] - min(-W0, min(X[:i+1])),
+    where X is the cumulative sum of S[i-1] - A[i] within the block and W0 is
+    the wait carried in from the previous block.
+    """
+    np.subtract(service[:-1], interarrival[1:], out=out[1:])
+    out[0] = previous_service - interarrival[0]
+    np.cumsum(out, out=out)
+
+    running_min = np.minimum.accumulate(out)
+    np.minimum(running_min, -wait, out=running_min)
+    np.subtract(out, running_min, out=out)
+
+    return out[-1], service[-1]
+
+
+def lindley(interarrival_times, service_times, block_size=BLOCK_SIZE, progress=None, cancel=None):
+    """Computes the waiting time in queue of every customer of a FIFO single server.
+
+    Uses the Lindley recursion W[i] = max(0, W[i-1] + S[i-1] - A[i]), with the
+    first customer finding the system empty, solved a block at a time so only
+    the block loop runs in Python.
+
+    Args:
+        interarrival_times (ndarray): Time between consecutive arrivals.
+        service_times (ndarray): Service time of each customer.
+        block_size (int): Number of customers solved per vectorized step.
+        progress (callable, optional): Called as progress(done, total) after each block.
+        cancel (threading.Event, optional): Checked before each block; once set,
+            SimulationCancelled is raised.
+
+    Returns:
+        ndarray: The time each customer spends in the queue.
+    """
+    num_customers = len(interarrival_times)
+    time_in_queue = np.empty(num_customers)
+    wait, previous_service = 0.0, 0.0
+
+    for start in range(0, num_customers, block_size):
+        if cancel is not None and cancel.is_set():
+            raise SimulationCancelled()
+        stop = min(start + block_size, num_customers)
+        wait, previous_service = _lindley_block(interarrival_times[start:stop], service_times[start:stop],
+                                                wait, previous_service, time_in_queue[start:stop])
+        if progress is not None:
+            progress(stop, num_customers)
+
+    return time_in_queue
+
+
+def fifo_servers(arrival_times, service_times, numberOfServers=1, systemCapacity=inf, servers=None, departures=None):
+    """Computes the waiting time in queue of every customer of a FIFO G/G/c/K system.
+
+    Each admitted customer is dispatched to the earliest-free of the c servers,
+    kept in a heap of server free times, so every customer costs O(log c). With
+    a finite capacity a second heap holds the departure times of the customers
+    still in the system; an arrival that finds K of them is blocked.
+
+    Args:
+        arrival_times (ndarray): Non-decreasing arrival time of each customer.
+        service_times (ndarray): Service time of each customer.
+        numberOfServers (int): Number of parallel servers (c).
+        systemCapacity (int): Maximum number of customers in the system (K).
+        servers (list, optional): Heap of server free times carried over from a
+            previous call, updated in place; all servers start free when None.
+        departures (list, optional): Heap of the departure times of customers
+            still in the system, carried over and updated in place like servers.
+
+    Returns:
+        Tuple[ndarray, ndarray]: The time each customer spends in the queue (NaN
+        for blocked customers) and the mask of blocked customers.
+    """
+    if numberOfServers <= 0:
+        raise ValueError("Number of servers must be a positive integer.")
+    if systemCapacity <= 0:
+        raise ValueError("System capacity must be a positive integer.")
+
+    if servers is None:
+        servers = [-inf] * numberOfServers
+    if departures is None:
+        departures = []
+    finite = systemCapacity != inf
+    time_in_queue = array("d")
+
+    for arrival, service in zip(arrival_times.tolist(), service_times.tolist()):
+        if finite:
+            while departures and departures[0] <= arrival:
+                heappop(departures)
+            if len(departures) >= systemCapacity:
+                time_in_queue.append(np.nan)
+                continue
+
+        start = servers[0] if servers[0] > arrival else arrival
+        heapreplace(servers, start + service)
+        time_in_queue.append(start - arrival)
+        if finite:
+            heappush(departures, start + service)
+
+    time_in_queue = np.frombuffer(time_in_queue, dtype=np.float64)
+    return time_in_queue, np.isnan(time_in_queue)
+
+
+def simulate_multi(lumbda, mu, numberOfServers=1, systemCapacity=inf, num_customers=100000, seed=None):
+    """Simulates a G/G/c/K queuing system with FIFO dispatch.
+
+    Args:
+        lumbda (float or Distribution): Arrival rate, or the interarrival time distribution.
+        mu (float or Distribution): Service rate of each server, or the service time distribution.
+        numberOfServers (int): Number of parallel servers (c).
+        systemCapacity (int): Maximum number of customers in the system (K).
+        num_customers (int): Number of arriving customers to simulate.
+        seed (int or Generator, optional): Seed for the random number generator, or a numpy.random.Generator.
+
+    Returns:
+        SimulationResult: The per-customer columns of the run.
+    """
+    rng = np.random.default_rng(seed)
+    with phase("generate"):
+        interarrival_times = as_distribution(lumbda).sample(rng, num_customers)
+        service_times = as_distribution(mu).sample(rng, num_customers)
+    return simulate_variates(interarrival_times, service_times, numberOfServers, systemCapacity)
+
+
+def simulate_variates(interarrival_times, service_times, numberOfServers=1, systemCapacity=inf):
+    """Runs already drawn interarrival and service times through a FIFO queue with c servers and capacity K.
+
+    This is the deterministic part of simulate_multi; feeding several systems
+    the same variates gives them common random numbers.
+
+    Returns:
+        SimulationResult: The per-customer columns of the run.
+    """
+    count("customers", len(interarrival_times))
+    arrival_times = np.cumsum(interarrival_times)
+    if numberOfServers == 1 and systemCapacity == inf:
+        with phase("lindley"):
+            time_in_queue, blocked = lindley(interarrival_times, service_times), None
+    else:
+        with phase("fifo_servers"):
+            time_in_queue, blocked = fifo_servers(arrival_times, service_times, numberOfServers, systemCapacity)
+        if systemCapacity == inf:
+            blocked = None
+
+    return SimulationResult(interarrival_times, service_times, arrival_times, time_in_queue, blocked)
+
+
+def simulate_chunks(lumbda, mu, numberOfServers=1, systemCapacity=inf, chunk_size=STREAM_CHUNK_SIZE, seed=None):
+    """Simulates a FIFO queue with c servers and capacity K for as long as the caller keeps reading.
+
+    Customers are generated a chunk at a time, carrying the Lindley state (one
+    server, unlimited capacity) or the server and departure heaps from chunk to
+    chunk, so a run can be extended until an estimate is precise enough.
+
+    Yields:
+        Tuple[ndarray, ndarray]: The time in queue (NaN when blocked) and the
+        service time of the next chunk_size customers.
+    """
+    rng = np.random.default_rng(seed)
+    arrivals, services = as_distribution(lumbda), as_distribution(mu)
+    single = numberOfServers == 1 and systemCapacity == inf
+    servers = [-inf] * numberOfServers
+    departures = []
+    wait, previous_service, clock = 0.0, 0.0, 0.0
+
+    while True:
+        with phase("generate"):
+            interarrival = arrivals.sample(rng, chunk_size)
+            service_times = services.sample(rng, chunk_size)
+        if single:
+            time_in_queue = np.empty(chunk_size)
+            with phase("lindley"):
+                wait, previous_service = _lindley_block(interarrival, service_times, wait, previous_service,
+                                                        time_in_queue)
+        else:
+            arrival_times = np.cumsum(interarrival)
+            arrival_times += clock
+            clock = arrival_times[-1]
+            with phase("fifo_servers"):
+                time_in_queue = fifo_servers(arrival_times, service_times, numberOfServers, systemCapacity,
+                                             servers, departures)[0]
+        count("customers", chunk_size)
+        yield time_in_queue, service_times
+
+
+def open_trace(path):
+    """Opens a trace of (arrival timestamp, service duration) rows without reading it into memory.
+
+    A .npy file must hold a float64 array of shape (n, 2), e.g. written with
+    np.save(path, np.column_stack((arrival_times, service_times))). Any other
+    file is read as raw native-endian float64 values, two per row.
+
+    Returns:
+        ndarray: A read-only memory-mapped (n, 2) view of the trace.
+    """
+    if path.endswith(".npy"):
+        trace = np.load(path, mmap_mode="r")
+    else:
+        trace = np.memmap(path, dtype=np.float64, mode="r").reshape(-1, 2)
+    if trace.ndim != 2 or trace.shape[1] != 2:
+        raise ValueError("Trace must have two columns: arrival timestamps and service durations.")
+    return trace
+
+
+def simulate_trace(path, numberOfServers=1, systemCapacity=inf, output=None, chunk_size=STREAM_CHUNK_SIZE):
+    """Replays a recorded trace through a FIFO queue with c servers and capacity K.
+
+    The trace is memory-mapped (see open_trace) and replayed a chunk at a
+    time, carrying the Lindley state (one server, unlimited capacity) or the
+    server and departure heaps (otherwise) from chunk to chunk, so the file is
+    never loaded into RAM. Arrival timestamps must be non-decreasing.
+
+    Args:
+        path (str): Trace file, .npy or raw float64.
+        numberOfServers (int): Number of parallel servers (c) to replay against.
+        systemCapacity (int): Maximum number of customers in the system (K).
+        output (str, optional): File receiving the time in queue of every customer
+            (NaN when blocked), written chunk by chunk as a .npy file or, for any
+            other extension, as raw float64 values.
+        chunk_size (int): Number of customers replayed at a time.
+
+    Returns:
+        Dict[str, RunningStats]: Running statistics of the time in queue and time
+        in system of admitted customers, with quantile sketches, and of a 0/1
+        blocked indicator whose mean is the blocking probability.
+    """
+    trace = open_trace(path)
+    num_customers = len(trace)
+    metrics = {"time_in_queue": RunningStats(SKETCH_ACCURACY), "time_in_system": RunningStats(SKETCH_ACCURACY),
+               "blocked": RunningStats()}
+    single = numberOfServers == 1 and systemCapacity == inf
+    servers = [-inf] * numberOfServers
+    departures = []
+    wait, previous_service = 0.0, 0.0
+    previous_arrival = float(trace[0, 0]) if num_customers else 0.0
+
+    if output is None:
+        sink = None
+    elif output.endswith(".npy"):
+        sink = np.lib.format.open_memmap(output, mode="w+", dtype=np.float64, shape=(num_customers,))
+    else:
+        sink = open(output, "wb")
+
+    try:
+        for start in range(0, num_customers, chunk_size):
+            with phase("read_trace"):
+                chunk = np.array(trace[start:start + chunk_size])
+            arrival_times, service_times = chunk[:, 0], chunk[:, 1]
+
+            if single:
+                interarrival = np.diff(arrival_times, prepend=previous_arrival)
+                time_in_queue = np.empty(len(chunk))
+                with phase("lindley"):
+                    wait, previous_service = _lindley_block(interarrival, service_times, wait, previous_service,
+                                                            time_in_queue)
+                blocked = np.zeros(len(chunk), dtype=bool)
+            else:
+                with phase("fifo_servers"):
+                    time_in_queue, blocked = fifo_servers(arrival_times, service_times, numberOfServers,
+                                                          systemCapacity, servers, departures)
+            previous_arrival = arrival_times[-1]
+
+            admitted = ~blocked
+            with phase("statistics"):
+                metrics["time_in_queue"].update(time_in_queue[admitted])
+                metrics["time_in_system"].update(time_in_queue[admitted] + service_times[admitted])
+                metrics["blocked"].update(blocked)
+            count("customers", len(chunk))
+
+            if isinstance(sink, np.memmap):
+                sink[start:start + len(chunk)] = time_in_queue
+            elif sink is not None:
+                time_in_queue.tofile(sink)
+    finally:
+        if isinstance(sink, np.memmap):
+            sink.flush()
+        elif sink is not None:
+            sink.close()
+
+    return metrics
+
+
+def simulate(lumbda, mu, num_customers=0, seed=None, rows=PREVIEW_ROWS, export=None):
     """Simulates a single-server queuing system.
 
     Args:
-        interarrival_times (List[float]): A list of interarrival times.
-        service_times (List[float]): A list of service times.
+        lumbda (float or Distribution): Arrival rate, or the interarrival time distribution.
+        mu (float or Distribution): Service rate, or the service time distribution.
+        num_customers (int): Number of customers to simulate, asked for when 0.
+        seed (int or Generator, optional): Seed for the random number generator, or a numpy.random.Generator.
+        rows (int, optional): Customers printed from each end of the run in the
+            table preview; 0 prints the performance metrics only and None
+            prints every customer.
+        export (str, optional): Also writes every customer row to this .csv or
+            .npz (columnar binary) file.
 
     Returns:
-        None. Prints the simulation results to the console.
+        SimulationResult: The per-customer columns of the run. Also prints the
+        simulation results to the console.
     """
-    
-    # Load the values of Global Variables
-    global completion_times, arrival_times
-    
+
     # Check if app operates as CLI vs GUI
     if num_customers == 0:
         num_customers = int(input("Enter the number of customers: "))
 
-    interarrival_times = 0.1*random.exponential(scale=lumbda, size=num_customers)
-    service_times  = 0.1*random.exponential(scale=mu, size=num_customers)
-
-    # Check if the length of interarrival_times and service_times are the same
-    if len(interarrival_times) != len(service_times):
-        raise ValueError("Interarrival times and service times must have the same length")
-
-    arrival_times = [0]  # Arrival time of the first customer is 0
-    for i in range(1, num_customers):
-        arrival_times.append(arrival_times[i - 1] + interarrival_times[i])
-
-    start_service_times = [0]
-    for i in range(1, num_customers):
-        start_service_times.append(
-            max(arrival_times[i], start_service_times[i - 1] + service_times[i - 1])
-        )
-
-    completion_times = [start_service_times[0] + service_times[0]]
-    for i in range(1, num_customers):
-        completion_times.append(start_service_times[i] + service_times[i])
-
-    time_in_system = [
-        completion_times[i] - arrival_times[i] for i in range(num_customers)
-    ]
-
-    time_in_queue = [
-        start_service_times[i] - arrival_times[i] for i in range(num_customers)
-    ]
-
-    server_idle_times = [0]
-    for i in range(1, num_customers):
-        server_idle_times.append(
-            max(0, arrival_times[i] - (start_service_times[i - 1] + service_times[i - 1]))
-        )
-
-
-    # Ensure all lists have the same length before creating the DataFrame
-    min_len = min(len(arrival_times), len(start_service_times), len(completion_times), len(time_in_system), len(time_in_queue), len(server_idle_times))
-
-    arrival_times = arrival_times[:min_len]
-    start_service_times = start_service_times[:min_len]
-    completion_times = completion_times[:min_len]
-    time_in_system = time_in_system[:min_len]
-    time_in_queue = time_in_queue[:min_len]
-    server_idle_times = server_idle_times[:min_len]
-    interarrival_times = interarrival_times[:min_len]
-    service_times = service_times[:min_len]
-
-    # customer_number was originally intended to be a list of numbers from 1 to num_customers
-    # let's adjust this to be a list of the same length as the others.
-    customer_number = list(range(1, min_len + 1))
-
-    """
-    data = {
-        "Customer Number": customer_number,
-        "Interarrival Times": interarrival_times,
-        "Arrival Times": arrival_times,
-        "Service Times": service_times,
-        "Time Service Begins": start_service_times,
-        "Completion Times": completion_times,
-        "Time in Queue": time_in_queue,
-        "Time in System": time_in_system,
-        "Server Idle Times": server_idle_times,
-    }
-
-    df = pd.DataFrame(data)
-    table = tabulate(df, headers='keys', tablefmt='presto') 
-    print(table)
-    """
-    table_data = [
-        [i + 1, arrival_time, service_begin_time, service_time, service_end_time,
-         time_in_queue, time_in_system]
-        for i, (arrival_time, service_begin_time, service_time, service_end_time,
-                time_in_queue, time_in_system) in
-        enumerate(zip(arrival_times,start_service_times, service_times,
-                      completion_times,  time_in_queue, time_in_system))
-    ]
-
-    # Calculate performance metrics          
-    performance_metrics(time_in_queue, service_times, interarrival_times, time_in_system)
-    
-    # Use tabulate to format the output
-    print(tabulate(table_data, headers=["Customer", "Arrival Time", "Service Begin Time",
-                                      "Service Time", "Service End Time",
-                                      "Time in Queue", "Time in System"],
-                   tablefmt="fancy_grid"))
-
-
-def performance_metrics(time_in_queue, service_times, interarrival_times, time_in_system):
-  # Calculate performance metrics
-    avg_waiting_time = sum(time_in_queue) / len(time_in_queue)
-    avg_service_time = sum(service_times) / len(service_times)
-    avg_interarrival_time = sum(interarrival_times[1:]) / len(interarrival_times[1:])  # Exclude the initial 0
-    avg_waiting_time_those_who_wait = sum(t for t in time_in_queue if t > 0) / sum(1 for t in time_in_queue if t > 0) if any(t > 0 for t in time_in_queue) else 0  # Handle cases where no one waits
-    avg_time_in_system = sum(time_in_system) / len(time_in_system)
-
-   # Print the performance metrics
-    print("\nPerformance Metrics:")
-    print(f"Average Waiting Time: {avg_waiting_time:.2f}")
-    print(f"Average Service Time: {avg_service_time:.2f}")
-    print(f"Average Time Between Arrivals: {avg_interarrival_time:.2f}")
-    print(f"Average Waiting Time of Those Who Wait: {avg_waiting_time_those_who_wait:.2f}")
-    print(f"Average Time a Customer Spends in the System: {avg_time_in_system:.2f}")
-    print("\n",flush=True)
-
-
-
-def chart():
-    # Load the values of the Global Variable
-    global completion_times, arrival_times
-    service_end_times = completion_times
-    
-    time_points = []
-    customer_count = []
-    current_customers = 0
-    events = []
-
-    for i in range(len(arrival_times)):
-        events.append((arrival_times[i], 1)) 
-        events.append((service_end_times[i], -1))
-    
-    # Sort events by time
-    events.sort()
-    
-    for time, event_type in events:
-        time_points.append(time)
-        current_customers += event_type
-        customer_count.append(current_customers)
-        
-
-    plt.figure(figsize=(10, 6))   
-    plt.step(time_points, customer_count, where='post')  # Use step plot for discrete events
-    plt.xlabel("Time")
-    plt.ylabel("Number of Customers in System")
-    plt.title("Customer Count Over Time")
-    plt.grid(True)
-    plt.show()
\ No newline at end of file
+    result = simulate_single(lumbda, mu, num_customers, seed)
+
+    # Calculate performance metrics
+    performance_metrics(result.time_in_queue, result.service_times, result.interarrival_times, result.time_in_system)
+
+    if rows == 0 and export is None:
+        return result
+
+    # The table layer pulls in tabulate, so it is only loaded when a table is printed
+    from report import export_table, print_table
+
+    if rows != 0:
+        with phase("render"):
+            print_table(result, rows)
+    if export is not None:
+        with phase("export"):
+            export_table(result, export)
+
+    return result
+
+
+def simulate_single(lumbda, mu, num_customers, seed=None, progress=None, cancel=None, block_size=BLOCK_SIZE):
+    """Simulates a single-server queuing system without printing anything.
+
+    Variates are drawn and pushed through the Lindley recursion block_size
+    customers at a time, and progress and cancel are checked between blocks,
+    so an interactive caller should pass a block much smaller than the run.
+    Progress counts both passes: drawing, then the recursion.
+
+    Args:
+        lumbda (float or Distribution): Arrival rate, or the interarrival time distribution.
+        mu (float or Distribution): Service rate, or the service time distribution.
+        num_customers (int): Number of customers to simulate.
+        seed (int or Generator, optional): Seed for the random number generator, or a numpy.random.Generator.
+        progress (callable, optional): Called as progress(done, total) after each block.
+        cancel (threading.Event, optional): Stops the run with SimulationCancelled once set.
+        block_size (int): Number of customers drawn and solved between progress and cancel checks.
+
+    Returns:
+        SimulationResult: The per-customer columns of the run.
+    """
+    rng = np.random.default_rng(seed)
+    block_size = max(int(block_size), 1)
+    interarrival_times, service_times = np.empty(num_customers), np.empty(num_customers)
+    with phase("generate"):
+        # All interarrival times are drawn before the service times, so the stream does not depend on block_size
+        done = 0
+        for distribution, out in ((as_distribution(lumbda), interarrival_times), (as_distribution(mu), service_times)):
+            for start in range(0, num_customers, block_size):
+                if cancel is not None and cancel.is_set():
+                    raise SimulationCancelled()
+                stop = min(start + block_size, num_customers)
+                distribution.fill(rng, out[start:stop])
+                done += stop - start
+                if progress is not None:
+                    progress(done, 3 * num_customers)
+
+    # Arrival time of the first customer is 0
+    arrival_times = np.empty(num_customers)
+    if num_customers:
+        arrival_times[0] = 0
+        np.cumsum(interarrival_times[1:], out=arrival_times[1:])
+
+    count("customers", num_customers)
+    if progress is not None:
+        solved = progress
+        progress = lambda stop, total: solved(2 * total + stop, 3 * total)
+    with phase("lindley"):
+        time_in_queue = lindley(interarrival_times, service_times, block_size, progress, cancel)
+    return SimulationResult(interarrival_times, service_times, arrival_times, time_in_queue)
+
+
+def simulate_stream(lumbda, mu, num_customers, chunk_size=STREAM_CHUNK_SIZE, seed=None):
+    """Simulates a single-server queuing system without keeping per-customer columns.
+
+    Customers are generated and pushed through the Lindley recursion a chunk
+    at a time, and only running statistics of each performance metric are
+    kept, so memory is O(chunk_size) whatever the number of customers. The
+    time in queue and time in system also keep DDSketches, from which the
+    PERCENTILES are printed.
+
+    Args:
+        lumbda (float or Distribution): Arrival rate, or the interarrival time distribution.
+        mu (float or Distribution): Service rate, or the service time distribution.
+        num_customers (int): Number of customers to simulate.
+        chunk_size (int): Number of customers generated and processed at a time.
+        seed (int or Generator, optional): Seed for the random number generator, or a numpy.random.Generator.
+
+    Returns:
+        Dict[str, RunningStats]: Running statistics of the time in queue, service
+        time, interarrival time, time in queue of those who wait and time in
+        system. Also prints the performance metrics to the console.
+    """
+    rng = np.random.default_rng(seed)
+    arrivals, services = as_distribution(lumbda), as_distribution(mu)
+    metrics = {name: RunningStats(SKETCH_ACCURACY if name in ("time_in_queue", "time_in_system") else None)
+               for name in ("time_in_queue", "service_times", "interarrival_times", "waiting_times", "time_in_system")}
+    buffer_size = min(chunk_size, num_customers)
+    interarrival_buffer, service_buffer, time_in_queue = np.empty(buffer_size), np.empty(buffer_size), np.empty(buffer_size)
+    wait, previous_service = 0.0, 0.0
+
+    for start in range(0, num_customers, chunk_size):
+        size = min(chunk_size, num_customers - start)
+        with phase("generate"):
+            interarrival = arrivals.fill(rng, interarrival_buffer[:size])
+            service = services.fill(rng, service_buffer[:size])
+
+        queue = time_in_queue[:size]
+        with phase("lindley"):
+            wait, previous_service = _lindley_block(interarrival, service, wait, previous_service, queue)
+
+        with phase("statistics"):
+            metrics["time_in_queue"].update(queue)
+            metrics["service_times"].update(service)
+            # The first interarrival time is not used, customer 1 arrives at 0
+            metrics["interarrival_times"].update(interarrival[1:] if start == 0 else interarrival)
+            metrics["waiting_times"].update(queue[queue > 0])
+            metrics["time_in_system"].update(queue + service)
+        count("customers", size)
+
+    print_metrics(metrics["time_in_queue"].mean, metrics["service_times"].mean,
+                  metrics["interarrival_times"].mean, metrics["waiting_times"].mean,
+                  metrics["time_in_system"].mean)
+    print(f"Probability of Waiting: {metrics['time_in_queue'].positive_fraction:.2f}")
+    # An empty run has no maximum or percentiles: report 0 like the averages and skip the sketch lines
+    if metrics["time_in_queue"].count:
+        print(f"Maximum Waiting Time: {metrics['time_in_queue'].max:.2f}")
+        print_percentiles(metrics["time_in_queue"], metrics["time_in_system"])
+    else:
+        print("Maximum Waiting Time: 0.00")
+
+    return metrics
+
+
+def performance_metrics(time_in_queue, service_times, interarrival_times, time_in_system, file=None):
+    # Calculate performance metrics
+    with phase("metrics"):
+        time_in_queue = np.asarray(time_in_queue)
+        waited = time_in_queue[time_in_queue > 0]
+
+        avg_waiting_time = time_in_queue.mean()
+        avg_service_time = np.mean(service_times)
+        avg_interarrival_time = np.mean(interarrival_times[1:]) if len(interarrival_times) > 1 else 0  # Exclude the initial 0
+        avg_waiting_time_those_who_wait = waited.mean() if len(waited) else 0  # Handle cases where no one waits
+        avg_time_in_system = np.mean(time_in_system)
+
+    print_metrics(avg_waiting_time, avg_service_time, avg_interarrival_time,
+                  avg_waiting_time_those_who_wait, avg_time_in_system, file)
+
+
+def print_metrics(avg_waiting_time, avg_service_time, avg_interarrival_time,
+                  avg_waiting_time_those_who_wait, avg_time_in_system, file=None):
+    # Print the performance metrics (to stdout unless another text file is given)
+    print("\nPerformance Metrics:", file=file)
+    print(f"Average Waiting Time: {avg_waiting_time:.2f}", file=file)
+    print(f"Average Service Time: {avg_service_time:.2f}", file=file)
+    print(f"Average Time Between Arrivals: {avg_interarrival_time:.2f}", file=file)
+    print(f"Average Waiting Time of Those Who Wait: {avg_waiting_time_those_who_wait:.2f}", file=file)
+    print(f"Average Time a Customer Spends in the System: {avg_time_in_system:.2f}", file=file)
+    print("\n", file=file, flush=True)
+
+
+
+def print_percentiles(time_in_queue, time_in_system, file=None):
+    # Print the percentiles of RunningStats that keep a sketch
+    for percentile in PERCENTILES:
+        print(f"p{percentile * 100:g} Waiting Time: {time_in_queue.quantile(percentile):.2f}, "
+              f"Time in System: {time_in_system.quantile(percentile):.2f}", file=file)
+    print("", file=file, flush=True)
+
+
+def timeline(result):
+    """Returns the event times of a run and the number of customers in the system after each event.
+
+    Arrivals and departures are each already sorted for a FIFO single server,
+    so they are merged by locating every event among the other stream with
+    searchsorted rather than sorting all 2n events; departures are only
+    sorted when they come out of order (several servers). At the same
+    instant, departures of earlier customers come before an arrival and a
+    customer's own departure after it, so a zero service time never drives
+    the count below zero. Blocked customers never enter the system and are
+    left out.
+
+    Returns:
+        Tuple[ndarray, ndarray]: The event times and the number in system after each.
+    """
+    arrivals, departures = result.arrival_times, result.completion_times
+    if result.blocked is not None:
+        arrivals, departures = arrivals[~result.blocked], departures[~result.blocked]
+    n = len(arrivals)
+    customers = np.arange(n)
+    if np.any(departures[1:] < departures[:-1]):
+        customers = np.argsort(departures, kind="stable")
+        departures = departures[customers]
+
+    # Every departure follows its own customer's arrival and any earlier arrival; arrivals fill the other slots
+    departure_slots = np.arange(n) + np.maximum(customers + 1, np.searchsorted(arrivals, departures, side="left"))
+    steps = np.ones(2 * n, dtype=np.int64)
+    steps[departure_slots] = -1
+    times = np.empty(2 * n)
+    times[departure_slots] = departures
+    times[steps == 1] = arrivals
+    return times, np.cumsum(steps)
+
+
+def time_average(times, counts):
+    """Returns the time-average number in system (L) of a timeline that starts empty at time 0."""
+    if len(times) < 2 or times[-1] <= 0:
+        return 0.0
+    return float(np.dot(counts[:-1], np.diff(times)) / times[-1])
+
+
+def downsample(times, counts, buckets=2000):
+    """Reduces a step timeline to a few points per time bucket, keeping each bucket's extremes.
+
+    The time span is cut into equal-width buckets (about one per pixel) and
+    every non-empty bucket becomes three points: its maximum and minimum
+    count at the bucket's first event time, then its last count at its last
+    event time. Peaks and troughs stay visible however many events a bucket
+    holds.
+
+    Returns:
+        Tuple[ndarray, ndarray]: The reduced times and counts.
+    """
+    if len(times) <= 3 * buckets:
+        return times, counts
+
+    span = times[-1] - times[0]
+    ids = ((times - times[0]) * (buckets / span)).astype(np.int64) if span > 0 else np.zeros(len(times), np.int64)
+    starts = np.flatnonzero(np.diff(ids, prepend=-1))
+    ends = np.append(starts[1:], len(times)) - 1
+
+    reduced_times = np.column_stack((times[starts], times[starts], times[ends])).ravel()
+    reduced_counts = np.column_stack((np.maximum.reduceat(counts, starts), np.minimum.reduceat(counts, starts),
+                                      counts[ends])).ravel()
+    return reduced_times, reduced_counts
+
+
+def chart_timeline(result, buckets=2000):
+    """Returns the downsampled timeline of a run and its time-average L, everything chart needs but the drawing.
+
+    Needs no plotting library, so it can run on a worker thread while the drawing stays on the GUI thread.
+
+    Returns:
+        Tuple[ndarray, ndarray, float]: The reduced times and counts and the time-average L of the full timeline.
+    """
+    time_points, customer_count = timeline(result)
+    average = time_average(time_points, customer_count)
+    time_points, customer_count = downsample(time_points, customer_count, buckets)
+    return time_points, customer_count, average
+
+
+def chart(result, buckets=2000):
+    """Plots the number of customers in the system over time, see plotting.chart."""
+    # Loaded on first use so that headless use of the simulation never imports matplotlib
+    from plotting import chart
+
+    with phase("chart"):
+        chart(result, buckets)
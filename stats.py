@@ -0,0 +1,243 @@
+from math import log, pi, sqrt, tan
+from statistics import NormalDist
+
+import numpy as np
+
+
+def t_quantile(p, df):
+    """Returns the p-quantile of Student's t distribution with df degrees of freedom.
+
+    Exact for 1 and 2 degrees of freedom, otherwise uses the Cornish-Fisher
+    expansion around the normal quantile, which is within 1% for 3 degrees of
+    freedom and within 1e-4 from about 10 on.
+    """
+    if df <= 0:
+        raise ValueError("Degrees of freedom must be positive.")
+    if df == 1:
+        return tan(pi * (p - 0.5))
+    if df == 2:
+        return (2 * p - 1) / sqrt(2 * p * (1 - p))
+
+    z = NormalDist().inv_cdf(p)
+    g1 = (z ** 3 + z) / 4
+    g2 = (5 * z ** 5 + 16 * z ** 3 + 3 * z) / 96
+    g3 = (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / 384
+    g4 = (79 * z ** 9 + 776 * z ** 7 + 1482 * z ** 5 - 1920 * z ** 3 - 945 * z) / 92160
+    return z + g1 / df + g2 / df ** 2 + g3 / df ** 3 + g4 / df ** 4
+
+
+def confidence_interval(samples, confidence=0.95):
+    """Returns the mean of independent samples and the half-width of its t confidence interval.
+
+    Args:
+        samples (ndarray): One value per independent observation, along axis 0.
+        confidence (float): Two-sided confidence level.
+
+    Returns:
+        Tuple[ndarray, ndarray]: The sample mean and the half-width.
+    """
+    samples = np.asarray(samples, dtype=np.float64)
+    n = len(samples)
+    mean = samples.mean(axis=0)
+    if n < 2:
+        return mean, np.full_like(mean, np.inf)
+    std_error = samples.std(axis=0, ddof=1) / sqrt(n)
+    return mean, t_quantile(0.5 + confidence / 2, n - 1) * std_error
+
+
+class DDSketch:
+    """
+    Streaming quantile sketch of non-negative values with a bounded relative error (DDSketch).
+
+    Positive values are counted in logarithmic buckets (gamma^(i-1), gamma^i]
+    with gamma = (1 + alpha) / (1 - alpha), so every quantile is returned within
+    a relative error alpha of a value of the stream, and zeros (customers that
+    did not wait) are counted exactly. Two sketches with the same alpha merge
+    exactly by adding bucket counts. At most max_buckets buckets are kept; past
+    that the lowest buckets are collapsed, which only affects low quantiles.
+    """
+
+    def __init__(self, relative_accuracy=0.01, max_buckets=2048):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("Relative accuracy must be between 0 and 1.")
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = log(self._gamma)
+        self.count = 0
+        self.zero_count = 0
+        self.offset = 0
+        self.counts = np.zeros(0, dtype=np.int64)
+
+    def update(self, values):
+        """Adds an array of non-negative values to the sketch."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if not len(values):
+            return self
+        if values.min() < 0:
+            raise ValueError("DDSketch only accepts non-negative values.")
+        positive = values[values > 0]
+        self.count += len(values)
+        self.zero_count += len(values) - len(positive)
+        if len(positive):
+            index = np.ceil(np.log(positive) / self._log_gamma).astype(np.int64)
+            low = int(index.min())
+            self._add(low, np.bincount(index - low))
+        return self
+
+    def merge(self, other):
+        """Adds the counts of another sketch with the same relative accuracy into this one."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Only sketches with the same relative accuracy can be merged.")
+        self.count += other.count
+        self.zero_count += other.zero_count
+        if len(other.counts):
+            self._add(other.offset, other.counts)
+        return self
+
+    def _add(self, offset, counts):
+        """Adds bucket counts starting at bucket index offset, growing the store as needed."""
+        if not len(self.counts):
+            self.offset, self.counts = offset, counts.astype(np.int64)
+        else:
+            low = min(self.offset, offset)
+            high = max(self.offset + len(self.counts), offset + len(counts))
+            if low != self.offset or high != self.offset + len(self.counts):
+                grown = np.zeros(high - low, dtype=np.int64)
+                grown[self.offset - low:self.offset - low + len(self.counts)] = self.counts
+                self.offset, self.counts = low, grown
+            self.counts[offset - self.offset:offset - self.offset + len(counts)] += counts
+
+        excess = len(self.counts) - self.max_buckets
+        if excess > 0:
+            self.counts[excess] += self.counts[:excess].sum()
+            self.offset += excess
+            self.counts = self.counts[excess:].copy()
+
+    def quantile(self, q):
+        """Returns the estimated q-quantile of the values seen, for a level or an array of levels."""
+        q = np.asarray(q, dtype=np.float64)
+        if not self.count:
+            raise ValueError("The sketch is empty.")
+        rank = q * (self.count - 1)
+        bucket = np.searchsorted(np.cumsum(self.counts), rank - self.zero_count, side="right")
+        bucket = np.minimum(bucket, max(len(self.counts) - 1, 0))
+        # Midpoint of the bucket in relative terms, 2 gamma^i / (gamma + 1)
+        estimate = 2 * np.exp((self.offset + bucket) * self._log_gamma) / (self._gamma + 1)
+        result = np.where(rank < self.zero_count, 0.0, estimate)
+        return float(result) if result.ndim == 0 else result
+
+
+class RunningStats:
+    """
+    Accumulates count, mean, variance, maximum and P(x > 0) of a stream of values.
+
+    Values are folded in a chunk at a time with the pairwise form of Welford's
+    update (Chan et al.), so memory stays constant however many values are seen
+    and two accumulators can be merged exactly. Given a relative accuracy, a
+    DDSketch of the values is kept as well for quantiles.
+    """
+
+    def __init__(self, relative_accuracy=None):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.max = -np.inf
+        self.positive = 0
+        self.sketch = None if relative_accuracy is None else DDSketch(relative_accuracy)
+
+    def update(self, values):
+        """Folds an array of values into the running statistics."""
+        values = np.asarray(values, dtype=np.float64)
+        if self.sketch is not None:
+            self.sketch.update(values)
+        if len(values):
+            chunk = RunningStats()
+            chunk.count = len(values)
+            chunk.mean = float(values.mean())
+            chunk._m2 = float(np.square(values - chunk.mean).sum())
+            chunk.max = float(values.max())
+            chunk.positive = int(np.count_nonzero(values > 0))
+            self.merge(chunk)
+        return self
+
+    def merge(self, other):
+        """Folds the statistics of another accumulator into this one."""
+        if self.sketch is not None and other.sketch is not None:
+            self.sketch.merge(other.sketch)
+        count = self.count + other.count
+        if count:
+            delta = other.mean - self.mean
+            self.mean += delta * other.count / count
+            self._m2 += other._m2 + delta * delta * self.count * other.count / count
+            self.count = count
+            self.max = max(self.max, other.max)
+            self.positive += other.positive
+        return self
+
+    @property
+    def variance(self):
+        """Sample variance of the values seen so far."""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def positive_fraction(self):
+        """Fraction of the values seen so far that were greater than zero."""
+        return self.positive / self.count if self.count else 0.0
+
+    def quantile(self, q):
+        """Estimated q-quantile of the values seen so far, from the sketch."""
+        if self.sketch is None:
+            raise ValueError("Quantiles need a relative accuracy for the sketch.")
+        return self.sketch.quantile(q)
+
+
+def mser(values, batch_size=5):
+    """Returns the number of leading observations to discard as warm-up, by the MSER-m rule.
+
+    The series is averaged over consecutive batches of batch_size (MSER-5 by
+    default) and truncated at the batch d that minimizes the squared standard
+    error of the remaining batch averages, SSE(d) / (n - d)^2. Only the first
+    half of the series is considered, as a minimum found later means the run
+    is too short to have reached steady state.
+
+    Args:
+        values (ndarray): Observations in the order they were produced.
+        batch_size (int): Number of observations per batch (m).
+
+    Returns:
+        int: The number of observations to drop from the start, a multiple of batch_size.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values) // batch_size
+    if n < 2:
+        return 0
+    batches = values[:n * batch_size].reshape(n, batch_size).mean(axis=1)
+
+    # Sums of the batches kept after dropping the first d, for every d at once
+    kept = np.arange(n, 0, -1)
+    total = np.cumsum(batches[::-1])[::-1]
+    squares = np.cumsum(np.square(batches)[::-1])[::-1]
+    statistic = (squares - total * total / kept) / (kept * kept)
+
+    return int(np.argmin(statistic[:n // 2 + 1])) * batch_size
+
+
+def batch_means(values, num_batches=30, confidence=0.95):
+    """Returns the mean of a correlated series and the half-width of its batch-means confidence interval.
+
+    The series is split into num_batches consecutive batches of equal size
+    (leftover observations at the end are dropped), whose averages are close
+    to independent when the batches are much longer than the correlation of
+    the series.
+
+    Returns:
+        Tuple[float, float]: The mean and the half-width.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    batch_size = len(values) // num_batches
+    if batch_size == 0:
+        raise ValueError("Need at least one observation per batch.")
+    batches = values[:num_batches * batch_size].reshape(num_batches, batch_size).mean(axis=1)
+    mean, half_width = confidence_interval(batches, confidence)
+    return float(mean), float(half_width)
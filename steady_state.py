@@ -0,0 +1,93 @@
+from math import inf
+
+import numpy as np
+
+from simulation import STREAM_CHUNK_SIZE, simulate_chunks
+from stats import batch_means, mser
+
+
+# Measures estimated from every admitted customer, in column order.
+MEASURES = ("W", "Wq")
+
+
+class SteadyStateResult:
+    """
+    Holds the batch-means estimates of a simulation truncated after its warm-up period.
+    """
+
+    def __init__(self, num_customers, warmup, means, half_widths, confidence):
+        self.num_customers = num_customers
+        self.warmup = warmup
+        self.means = means
+        self.half_widths = half_widths
+        self.confidence = confidence
+
+    def interval(self, measure):
+        """Returns the (low, high) confidence interval of a measure such as "W"."""
+        return self.means[measure] - self.half_widths[measure], self.means[measure] + self.half_widths[measure]
+
+    def relative_half_width(self, measure):
+        """Returns the half-width of a measure's interval relative to its mean."""
+        return self.half_widths[measure] / abs(self.means[measure]) if self.means[measure] else inf
+
+    def display(self):
+        print(f"Customers: {self.num_customers} (first {self.warmup} discarded as warm-up, "
+              f"{self.confidence:.0%} confidence)")
+        for measure in MEASURES:
+            print(f"{measure}: {self.means[measure]} ± {self.half_widths[measure]}")
+
+
+def steady_state(lumbda, mu, numberOfServers=1, systemCapacity=inf, num_customers=100000, target=None,
+                 max_customers=10 ** 8, num_batches=30, confidence=0.95, seed=None):
+    """Estimates the steady-state W and Wq of an M/M/c/K queue from one long run.
+
+    The warm-up is found with MSER-5 on the time in system of each admitted
+    customer and dropped, and the rest is split into num_batches batches for
+    a batch-means confidence interval. With a target, the run is doubled until
+    the half-width of W is at most target times its mean or max_customers is
+    reached, instead of fixing the run length up front.
+
+    Args:
+        lumbda (float or Distribution): Arrival rate, or the interarrival time distribution.
+        mu (float or Distribution): Service rate of each server, or the service time distribution.
+        numberOfServers (int): Number of parallel servers (c).
+        systemCapacity (int): Maximum number of customers in the system (K).
+        num_customers (int): Customers simulated before the first estimate.
+        target (float, optional): Relative half-width of W at which to stop.
+        max_customers (int): Upper limit on the run length when a target is given.
+        num_batches (int): Number of batches of the batch-means estimator.
+        confidence (float): Two-sided confidence level of the intervals.
+        seed (int or Generator, optional): Seed for the random number generator, or a numpy.random.Generator.
+
+    Returns:
+        SteadyStateResult: The estimates, their half-widths and the warm-up length.
+    """
+    chunks = simulate_chunks(lumbda, mu, numberOfServers, systemCapacity,
+                             min(STREAM_CHUNK_SIZE, num_customers), seed)
+    queue, service = [], []
+    simulated, length = 0, num_customers
+
+    while True:
+        while simulated < length:
+            time_in_queue, service_times = next(chunks)
+            queue.append(time_in_queue)
+            service.append(service_times)
+            simulated += len(time_in_queue)
+
+        time_in_queue, service_times = np.concatenate(queue), np.concatenate(service)
+        queue, service = [time_in_queue], [service_times]
+
+        # Blocked customers have no waiting time
+        admitted = ~np.isnan(time_in_queue)
+        time_in_queue, service_times = time_in_queue[admitted], service_times[admitted]
+        time_in_system = time_in_queue + service_times
+
+        warmup = mser(time_in_system)
+        means, half_widths = {}, {}
+        for measure, values in (("W", time_in_system), ("Wq", time_in_queue)):
+            means[measure], half_widths[measure] = batch_means(values[warmup:], num_batches, confidence)
+        result = SteadyStateResult(simulated, warmup, means, half_widths, confidence)
+
+        if target is None or result.relative_half_width("W") <= target or simulated >= max_customers:
+            return result
+        length = min(2 * simulated, max_customers)
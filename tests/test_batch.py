@@ -0,0 +1,26 @@
+from math import inf
+
+import batch
+
+
+def test_non_positive_capacity_means_unlimited(tmp_path):
+    path = tmp_path / "scenarios.csv"
+    path.write_text("lambda,mu,c,K\n0.5,1,1,0\n0.5,1,2,-1\n0.5,1,1,\n0.5,1,1,5\n")
+    capacities = [scenario["systemCapacity"] for scenario in batch.read_scenarios(str(path))]
+    assert capacities == [inf, inf, inf, 5]
+
+
+def test_simulation_errors_are_reported_in_the_row(monkeypatch):
+    def failing(*args, **kwargs):
+        raise ValueError("simulation failed")
+
+    monkeypatch.setattr(batch, "simulate_multi", failing)
+    row = batch.evaluate({"lumbda": 0.5, "mu": 1.0, "numberOfServers": 1, "systemCapacity": inf}, 100)
+    assert row["error"] == "simulation failed"
+    assert row["W"] == 2.0
+
+
+def test_batch_results_do_not_depend_on_the_number_of_processes():
+    scenarios = [{"lumbda": 0.5 + 0.1 * i, "mu": 1.0, "numberOfServers": 1, "systemCapacity": inf} for i in range(4)]
+    assert batch.run_batch(scenarios, 1000, seed=1, processes=1) == batch.run_batch(scenarios, 1000, seed=1,
+                                                                                     processes=2)
@@ -0,0 +1,35 @@
+import benchmark
+
+
+def report(commit, customers_per_second, error, accuracy_customers=10 ** 6):
+    return {
+        "commit": commit,
+        "simulate": [{"customers": 1000, "customers_per_second": customers_per_second,
+                      "relative_error": {"W": error, "Wq": error, "L": error}}],
+        "models": [{"model": "MM1", "servers": 1, "seconds": 1e-6}],
+        "accuracy": [{"servers": 1, "capacity": None, "customers": accuracy_customers,
+                      "customers_per_second": customers_per_second,
+                      "relative_error": {"W": error, "Wq": error, "L": error}}],
+    }
+
+
+def test_compare_flags_speed_and_accuracy_regressions(capsys):
+    baseline = report("a", 1e6, 0.01)
+    assert benchmark.compare(baseline, report("b", 1e6, 0.01)) == []
+    assert "simulate 1000" in benchmark.compare(baseline, report("b", 5e5, 0.01))
+    regressions = benchmark.compare(baseline, report("b", 1e6, 0.05))
+    assert "simulate 1000 error W" in regressions and "accuracy c=1 K=inf error W" in regressions
+
+
+def test_compare_skips_accuracy_runs_of_other_lengths(capsys):
+    baseline = report("a", 1e6, 0.003, accuracy_customers=10 ** 5)
+    latest = report("b", 1e6, 0.003, accuracy_customers=10 ** 4)
+    latest["accuracy"][0]["relative_error"] = {"W": 0.0182, "Wq": 0.0182, "L": 0.0182}
+    assert benchmark.compare(baseline, latest) == []
+    assert "accuracy" not in capsys.readouterr().out
+
+
+def test_short_timings_are_repeated_to_the_minimum_duration():
+    calls = []
+    benchmark._timed(lambda: calls.append(1), min_seconds=0.05)
+    assert len(calls) > 10
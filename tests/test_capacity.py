@@ -0,0 +1,32 @@
+from math import inf
+
+import pytest
+
+from capacity import max_arrival_rate, min_servers
+from models import MMC, MMCK
+
+
+def test_min_servers_is_the_first_count_meeting_the_target():
+    c = min_servers(40.0, 1.0, maxWq=0.05)
+    assert MMC(40.0, 1.0, c).findWq() <= 0.05 < MMC(40.0, 1.0, c - 1).findWq()
+
+
+def test_min_servers_with_a_capacity_meets_the_blocking_target():
+    c = min_servers(9.0, 1.0, 20, maxPBlock=0.01)
+    assert MMCK(9.0, 1.0, c, 20).findPk(20) <= 0.01 < MMCK(9.0, 1.0, c - 1, 20).findPk(20)
+
+
+def test_min_servers_scales_to_large_loads():
+    c = min_servers(90000.0, 1.0, maxWq=0.001)
+    assert MMC(90000.0, 1.0, c).findWq() <= 0.001 < MMC(90000.0, 1.0, c - 1).findWq()
+
+
+def test_max_arrival_rate_meets_the_target_at_the_boundary():
+    lumbda = max_arrival_rate(1.0, 5, maxWq=0.5)
+    assert MMC(lumbda, 1.0, 5).findWq() == pytest.approx(0.5, rel=1e-6)
+
+
+def test_max_arrival_rate_with_a_capacity_meets_the_blocking_target():
+    lumbda = max_arrival_rate(1.0, 10, 15, maxPBlock=0.01)
+    assert MMCK(lumbda, 1.0, 10, 15).findPk(15) == pytest.approx(0.01, rel=1e-6)
+    assert max_arrival_rate(1.0, 3, 10, maxWq=100.0) == inf
@@ -0,0 +1,30 @@
+import json
+import os
+import subprocess
+import sys
+
+import CLI
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_importing_models_loads_no_heavy_modules():
+    code = "import sys, models; print(' '.join(m for m in ('numpy', 'simulation', 'tabulate', 'matplotlib') if m in sys.modules))"
+    loaded = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    assert loaded.strip() == ""
+
+
+def test_profile_switch_leaves_the_subcommand_alone(tmp_path, capsys):
+    scenarios, results = tmp_path / "scenarios.csv", tmp_path / "results.csv"
+    scenarios.write_text("lambda,mu,c,K\n0.5,1,1,\n1.5,1,2,5\n")
+    CLI.main(["--profile", "batch", str(scenarios), "-o", str(results), "--simulate", "1000", "--jobs", "1"])
+    assert len(results.read_text().splitlines()) == 3
+    assert "Profile over" in capsys.readouterr().err
+
+
+def test_trace_writes_a_chrome_trace(tmp_path, capsys):
+    scenarios, trace = tmp_path / "scenarios.csv", tmp_path / "trace.json"
+    scenarios.write_text("lambda,mu,c,K\n0.5,1,1,\n")
+    CLI.main(["--trace", str(trace), "batch", str(scenarios), "-o", str(tmp_path / "results.jsonl"), "--jobs", "1"])
+    assert "traceEvents" in json.loads(trace.read_text())
+    assert "Profile over" in capsys.readouterr().err
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from distributions import (Deterministic, Empirical, Erlang, Exponential, HyperExponential, LogNormal,
+                           as_distribution)
+from simulation import simulate_multi
+
+DISTRIBUTIONS = [Exponential(2.0), Deterministic(0.5), Erlang(3, 2.0), HyperExponential([0.3, 0.7], [0.5, 4.0]),
+                 LogNormal(0.5, 1.5), Empirical([0.1, 0.4, 1.0])]
+
+
+@pytest.mark.parametrize("distribution", DISTRIBUTIONS, ids=lambda d: type(d).__name__)
+def test_variates_fill_the_buffer_with_the_declared_mean(distribution):
+    out = np.empty(400000)
+    assert distribution.fill(np.random.default_rng(1), out) is out
+    assert np.all(out >= 0)
+    assert out.mean() == pytest.approx(distribution.mean, rel=0.02)
+
+
+def test_rates_become_exponential_times():
+    assert isinstance(as_distribution(3.0), Exponential) and as_distribution(3.0).mean == pytest.approx(1 / 3)
+    deterministic = Deterministic(1.0)
+    assert as_distribution(deterministic) is deterministic
+
+
+@pytest.mark.parametrize("service, scv", [(Deterministic(1.0), 0.0), (Erlang(4, 1.0), 0.25),
+                                          (HyperExponential([0.5, 0.5], [2 / 3, 2.0]), 1.5)])
+def test_mg1_waiting_time_matches_pollaczek_khinchine(service, scv):
+    lumbda = 0.7
+    expected = lumbda * (1 + scv) / (2 * (1 - lumbda))
+    assert simulate_multi(lumbda, service, 1, num_customers=400000, seed=2).summary()["Wq"] == \
+        pytest.approx(expected, rel=0.05)
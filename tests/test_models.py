@@ -0,0 +1,105 @@
+from math import factorial, inf, lgamma
+
+import numpy as np
+import pytest
+
+from models import MM1, MM1K, MMC, MMCK, erlang_b, log_erlang_b, log_factorials, model, solve, sweep
+
+
+def direct_erlang_b(r, c):
+    return (r ** c / factorial(c)) / sum(r ** k / factorial(k) for k in range(c + 1))
+
+
+def direct_mmc_wq(lumbda, mu, c):
+    r, ru = lumbda / mu, lumbda / (c * mu)
+    tail = r ** c / (factorial(c) * (1 - ru))
+    p0 = 1 / (sum(r ** k / factorial(k) for k in range(c)) + tail)
+    return tail * p0 / (c * mu - lumbda)
+
+
+@pytest.mark.parametrize("r, c", [(0.5, 1), (3.2, 4), (8.0, 10), (15.0, 30)])
+def test_erlang_b_recursion_matches_the_closed_form(r, c):
+    assert erlang_b(r, c)[0] == pytest.approx(direct_erlang_b(r, c), rel=1e-12)
+
+
+def test_log_factorials_match_lgamma():
+    np.testing.assert_allclose(log_factorials(1000), [lgamma(j + 1) for j in range(1001)], rtol=1e-12)
+
+
+@pytest.mark.parametrize("r", [0.3, 40.0, 2500.0])
+def test_erlang_b_over_every_server_count_matches_the_recursion(r):
+    c = np.arange(3000)
+    np.testing.assert_allclose(np.exp(log_erlang_b(r, 2999)[1:]), erlang_b(r, c[1:])[0], rtol=1e-9)
+
+
+@pytest.mark.parametrize("lumbda, c", [(0.7, 1), (3.5, 4), (9.0, 10), (25.0, 30)])
+def test_mmc_waiting_time_matches_the_erlang_c_formula(lumbda, c):
+    assert MMC(lumbda, 1.0, c).findWq() == pytest.approx(direct_mmc_wq(lumbda, 1.0, c), rel=1e-10)
+
+
+def test_large_server_counts_stay_finite():
+    system = MMC(9900.0, 1.0, 10000)
+    assert np.isfinite(system.findWq()) and 0 < system.findWq() < 1
+    assert np.isfinite(MMCK(9900.0, 1.0, 10000, 10500).findL())
+
+
+def test_sweep_matches_the_models_point_by_point():
+    lumbda = np.array([[0.5], [2.5], [7.0]])
+    c = np.array([1, 3, 8])
+    capacity = np.array([inf, 12])[:, None, None]
+    results = sweep(lumbda, 1.0, c, capacity)
+    for k, K in enumerate((inf, 12)):
+        for i, rate in enumerate(lumbda[:, 0]):
+            for j, servers in enumerate(c):
+                assert results["W"].mask[k, i, j] == (K == inf and rate >= servers)
+                if rate >= servers:
+                    # The model classes only accept stable rates, even with a finite capacity
+                    continue
+                system = model(float(rate), 1.0, int(servers), K)
+                for name, value in (("L", system.findL()), ("Lq", system.findLq()), ("W", system.findW()),
+                                    ("Wq", system.findWq())):
+                    assert results[name][k, i, j] == pytest.approx(value, rel=1e-9)
+
+
+def test_mm1_is_the_single_server_special_case():
+    assert MMC(0.6, 1.0, 1).measures().W == pytest.approx(MM1(0.6, 1.0).findW())
+    assert MMCK(0.6, 1.0, 1, 7).findL() == pytest.approx(MM1K(0.6, 1.0, 7).findL())
+
+
+def test_solve_is_cached_and_its_measures_are_immutable():
+    solve.cache_clear()
+    measures = solve(0.5, 1.0, 2)
+    assert solve(0.5, 1.0, 2) is measures
+    assert solve.cache_info().hits == 1
+    with pytest.raises(AttributeError):
+        measures.W = 0
+
+
+@pytest.mark.parametrize("c, capacity", [(1, inf), (3, inf), (1, 6), (3, 9)])
+def test_distribution_is_normalized_and_matches_l(c, capacity):
+    system = model(0.8 * c, 1.0, c, capacity)
+    n_max = 400 if capacity == inf else capacity
+    p = system.distribution(n_max)
+    assert p.sum() == pytest.approx(1, abs=1e-9)
+    assert np.dot(np.arange(n_max + 1), p) == pytest.approx(system.findL(), rel=1e-6)
+    assert system.cdf(n_max)[system.quantile(0.9)] >= 0.9
+
+
+def test_distribution_at_large_server_counts_sums_to_one():
+    assert MMC(9900.0, 1.0, 10000).distribution(20000).sum() == pytest.approx(1, abs=1e-9)
+
+
+@pytest.mark.parametrize("c, capacity", [(1, inf), (4, inf), (1, 8), (4, 10)])
+def test_time_tails_integrate_to_the_mean_times(c, capacity):
+    system = model(0.85 * c, 1.0, c, capacity)
+    t = np.linspace(0, 40 * system.findW(), 20001)
+    assert np.trapezoid(system.waiting_tail(t), t) == pytest.approx(system.findWq(), rel=1e-4)
+    assert np.trapezoid(system.sojourn_tail(t), t) == pytest.approx(system.findW(), rel=1e-4)
+
+
+def test_time_quantiles_invert_the_tails():
+    system = MMC(3.4, 1.0, 4)
+    q = np.array([0.9, 0.99, 0.999])
+    np.testing.assert_allclose(system.waiting_tail(system.waiting_quantile(q)), 1 - q, rtol=1e-6)
+    np.testing.assert_allclose(system.sojourn_tail(system.sojourn_quantile(q)), 1 - q, rtol=1e-6)
+    assert system.waiting_quantile(0.01) == 0
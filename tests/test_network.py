@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from models import MM1, MMC
+from network import JacksonNetwork, simulate_network, traffic
+
+FEEDBACK = [[0, 0.7, 0.2], [0, 0, 0.9], [0.1, 0, 0]]
+
+
+def test_tandem_of_stations_adds_their_sojourn_times():
+    network = JacksonNetwork([1.0, 0.0], [2.0, 3.0], [[0, 1], [0, 0]], [1, 2])
+    assert network.findW() == pytest.approx(MM1(1.0, 2.0).findW() + MMC(1.0, 3.0, 2).findW())
+    assert network.measures().P0 == pytest.approx(MM1(1.0, 2.0).measures().P0 * MMC(1.0, 3.0, 2).P0)
+
+
+def test_measures_are_plain_floats():
+    measures = JacksonNetwork([1.0, 0.5, 0.0], [3.0, 2.5, 1.2], FEEDBACK, [1, 1, 2]).measures()
+    assert all(type(getattr(measures, name)) is float for name in ("L", "Lq", "W", "Wq", "Ru", "P0"))
+    assert "np." not in repr(measures)
+
+
+def test_traffic_equations_balance_the_flows():
+    external, routing = np.array([1.0, 0.5, 0.0]), np.array(FEEDBACK)
+    rates = traffic(external, routing)
+    np.testing.assert_allclose(rates, external + routing.T @ rates)
+
+
+def test_station_measures_match_the_station_models():
+    network = JacksonNetwork([1.0, 0.5, 0.0], [3.0, 2.5, 1.2], FEEDBACK, [1, 1, 2])
+    stations = network.station_measures()
+    for i in range(3):
+        assert stations["W"][i] == pytest.approx(network.station(i).findW(), rel=1e-9)
+
+
+def test_simulation_agrees_with_the_jackson_solution():
+    network = JacksonNetwork([1.0, 0.5, 0.0], [3.0, 2.5, 1.2], FEEDBACK, [1, 1, 2])
+    result = simulate_network([1.0, 0.5, 0.0], [3.0, 2.5, 1.2], FEEDBACK, [1, 1, 2], 200000, seed=2)
+    assert result.summary()["W"] == pytest.approx(network.findW(), rel=0.03)
+    np.testing.assert_allclose(result.station_summary()["W"], network.station_measures()["W"], rtol=0.04)
+
+
+@pytest.mark.parametrize("routing", [[[0, 1], [1, 0]], [[0, -0.5], [0, 0]], [[0.7, 0.7], [0, 0]], [[0, 1]]])
+def test_invalid_routing_is_rejected_before_simulating(routing):
+    with pytest.raises(ValueError):
+        simulate_network([1.0, 0.0], [2.0, 2.0], routing, num_customers=100)
+    with pytest.raises(ValueError):
+        JacksonNetwork([1.0, 0.0], [2.0, 2.0], routing)
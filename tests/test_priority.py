@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from models import MM1, MMC
+from priority import IndexedHeap, simulate_priority, solve_priority
+
+
+def test_indexed_heap_top_is_the_smallest_key():
+    rng = np.random.default_rng(1)
+    heap = IndexedHeap(50)
+    keys = np.full(50, np.inf)
+    for _ in range(5000):
+        slot, key = int(rng.integers(50)), float(rng.choice([rng.random(), np.inf]))
+        heap.update(slot, key)
+        keys[slot] = key
+        assert heap.top()[1] == keys.min()
+        assert keys[heap.top()[0]] == keys.min()
+
+
+@pytest.mark.parametrize("c", [1, 3])
+@pytest.mark.parametrize("preemptive", [False, True])
+def test_one_class_is_the_plain_queue(c, preemptive):
+    (measures,) = solve_priority([0.7 * c], [1.0], c, preemptive)
+    assert measures.W == pytest.approx(MM1(0.7, 1.0).findW() if c == 1 else MMC(0.7 * c, 1.0, c).findW())
+
+
+def test_preemptive_top_class_ignores_the_others():
+    top = solve_priority([0.3, 0.5], [1.0, 1.0], 1, preemptive=True)[0]
+    assert top.W == pytest.approx(MM1(0.3, 1.0).findW())
+
+
+def test_work_is_conserved_across_disciplines_with_equal_rates():
+    for c in (1, 3):
+        lumbdas = [0.3 * c, 0.4 * c]
+        for preemptive in (False, True):
+            total = sum(m.L for m in solve_priority(lumbdas, [1.0, 1.0], c, preemptive))
+            assert total == pytest.approx(MMC(0.7 * c, 1.0, c).findL() if c > 1 else MM1(0.7, 1.0).findL())
+
+
+@pytest.mark.parametrize("c, mus", [(1, [1.5, 1.0]), (3, [1.0, 1.0])])
+@pytest.mark.parametrize("preemptive", [False, True])
+def test_simulation_agrees_with_the_analytic_priority_queue(c, mus, preemptive):
+    lumbdas = [0.3, 0.4] if c == 1 else [0.9, 0.9]
+    simulated = simulate_priority(lumbdas, mus, c, preemptive, 300000, seed=1).summary()
+    for summary, measures in zip(simulated, solve_priority(lumbdas, mus, c, preemptive)):
+        assert summary["W"] == pytest.approx(measures.W, rel=0.04)
+
+
+def test_preempted_customers_keep_their_order_within_a_class():
+    # With one server and deterministic service of equal length, FIFO within a class means
+    # customers of the lowest class leave in the order they arrived, however often preempted
+    from distributions import Deterministic
+
+    result = simulate_priority([0.25, 0.4], [Deterministic(1.0), Deterministic(1.0)], 1, True, 50000, seed=3)
+    low = result.classes == 1
+    done = (result.arrival_times + result.time_in_system)[low]
+    assert np.all(np.diff(done) >= -1e-9)
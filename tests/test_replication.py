@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+from models import MMC
+from replication import compare, replicate
+
+
+def test_replications_cover_the_analytic_mean_and_do_not_depend_on_processes():
+    result = replicate(1.6, 1.0, 2, num_customers=5000, replications=20, seed=1, processes=1)
+    again = replicate(1.6, 1.0, 2, num_customers=5000, replications=20, seed=1, processes=2)
+    np.testing.assert_array_equal(result.samples, again.samples)
+    low, high = result.interval("W")
+    assert low - 0.1 < MMC(1.6, 1.0, 2).findW() < high + 0.1
+
+
+def test_common_random_numbers_narrow_the_paired_difference():
+    result = compare([(4.0, 1.0, 5), (4.0, 1.05, 5)], num_customers=10000, replications=20, seed=3, processes=1)
+    low, high = result.difference(1, "W")
+    assert low < MMC(4.0, 1.05, 5).findW() - MMC(4.0, 1.0, 5).findW() + 0.05
+    assert high - low < result.independent_half_width(1, "W")
+    again = compare([(4.0, 1.0, 5), (4.0, 1.05, 5)], num_customers=10000, replications=20, seed=3, processes=2)
+    np.testing.assert_array_equal(result.samples, again.samples)
+
+
+def test_compare_needs_two_configurations():
+    with pytest.raises(ValueError):
+        compare([(1.0, 2.0)])
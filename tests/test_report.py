@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from report import EXPORT_CHUNK_SIZE, export_table, print_table, table_columns
+from simulation import simulate_single
+
+
+@pytest.fixture(scope="module")
+def result():
+    return simulate_single(0.9, 1.0, EXPORT_CHUNK_SIZE + 100, seed=3)
+
+
+def test_preview_prints_only_the_first_and_last_rows(result, capsys):
+    print_table(result, rows=3)
+    lines = [line for line in capsys.readouterr().out.splitlines() if line.startswith("│")]
+    # Header, three rows, the gap marker and three rows
+    assert len(lines) == 8
+    assert "..." in lines[4]
+    assert lines[-1].split("│")[1].strip() == str(len(result))
+
+
+@pytest.mark.parametrize("extension", [".csv", ".npz"])
+def test_export_round_trips_every_row(result, tmp_path, extension):
+    path = str(tmp_path / ("table" + extension))
+    export_table(result, path)
+    if extension == ".csv":
+        columns = np.loadtxt(path, delimiter=",", skiprows=1, unpack=True)
+    else:
+        with np.load(path) as data:
+            columns = [data[name] for name in data.files]
+    for exported, column in zip(columns, table_columns(result)):
+        np.testing.assert_array_equal(exported, column)
+
+
+def test_export_rejects_unknown_file_types(result, tmp_path):
+    with pytest.raises(ValueError):
+        export_table(result, str(tmp_path / "table.xlsx"))
@@ -0,0 +1,156 @@
+import threading
+from math import inf
+
+import numpy as np
+import pytest
+
+from distributions import Deterministic, Empirical
+from models import MM1, model
+from simulation import (SimulationCancelled, chart_timeline, fifo_servers, lindley, simulate_multi, simulate_single,
+                        simulate_stream, simulate_trace, simulate_variates, time_average, timeline)
+
+
+def naive_lindley(interarrival, service):
+    wait = np.zeros(len(interarrival))
+    for i in range(1, len(interarrival)):
+        wait[i] = max(0.0, wait[i - 1] + service[i - 1] - interarrival[i])
+    return wait
+
+
+def naive_servers(arrivals, service, c, capacity=inf):
+    free = [0.0] * c
+    in_system = []
+    wait = []
+    for arrival, duration in zip(arrivals, service):
+        in_system = [departure for departure in in_system if departure > arrival]
+        if len(in_system) >= capacity:
+            wait.append(np.nan)
+            continue
+        server = min(range(c), key=lambda s: free[s])
+        start = max(arrival, free[server])
+        free[server] = start + duration
+        in_system.append(start + duration)
+        wait.append(start - arrival)
+    return np.array(wait)
+
+
+@pytest.fixture
+def variates():
+    rng = np.random.default_rng(7)
+    return rng.exponential(1 / 0.9, 5000), rng.exponential(1.0, 5000)
+
+
+@pytest.mark.parametrize("block_size", [1, 7, 1000, 1 << 20])
+def test_lindley_matches_the_recursion_for_any_block_size(variates, block_size):
+    interarrival, service = variates
+    np.testing.assert_allclose(lindley(interarrival, service, block_size), naive_lindley(interarrival, service),
+                               atol=1e-9)
+
+
+@pytest.mark.parametrize("c, capacity", [(1, inf), (3, inf), (1, 4), (3, 6)])
+def test_fifo_servers_matches_a_direct_dispatch(variates, c, capacity):
+    interarrival, service = variates
+    arrivals = np.cumsum(interarrival) / c
+    time_in_queue, blocked = fifo_servers(arrivals, service, c, capacity)
+    expected = naive_servers(arrivals, service, c, capacity)
+    np.testing.assert_array_equal(blocked, np.isnan(expected))
+    np.testing.assert_allclose(time_in_queue[~blocked], expected[~blocked], atol=1e-9)
+
+
+def test_fifo_servers_with_one_server_matches_lindley(variates):
+    interarrival, service = variates
+    time_in_queue, _ = fifo_servers(np.cumsum(interarrival), service)
+    np.testing.assert_allclose(time_in_queue, lindley(interarrival, service), atol=1e-9)
+
+
+@pytest.mark.parametrize("c, capacity", [(1, inf), (4, inf), (1, 8), (4, 10)])
+def test_simulate_multi_agrees_with_the_analytic_models(c, capacity):
+    lumbda, mu = 0.8 * c, 1.0
+    summary = simulate_multi(lumbda, mu, c, capacity, 400000, seed=3).summary()
+    system = model(lumbda, mu, c, capacity)
+    assert summary["W"] == pytest.approx(system.findW(), rel=0.04)
+    assert summary["L"] == pytest.approx(system.findL(), rel=0.04)
+    if capacity != inf:
+        assert summary["Pb"] == pytest.approx(system.findPk(capacity), abs=0.005)
+
+
+def test_simulate_multi_is_simulate_variates_of_its_draws():
+    result = simulate_multi(0.9, 1.0, 2, 5, 2000, seed=11)
+    again = simulate_variates(result.interarrival_times, result.service_times, 2, 5)
+    np.testing.assert_array_equal(result.time_in_queue, again.time_in_queue)
+
+
+def test_simulate_stream_agrees_with_the_analytic_model(capsys):
+    metrics = simulate_stream(0.8, 1.0, 400000, chunk_size=10000, seed=6)
+    assert metrics["time_in_queue"].count == 400000
+    assert metrics["time_in_queue"].mean == pytest.approx(MM1(0.8, 1.0).findWq(), rel=0.05)
+    assert metrics["time_in_system"].mean == pytest.approx(MM1(0.8, 1.0).findW(), rel=0.05)
+    assert "Average" in capsys.readouterr().out
+
+
+def test_timeline_counts_every_arrival_and_departure():
+    result = simulate_multi(1.5, 1.0, 2, 4, 3000, seed=4)
+    times, counts = timeline(result)
+    assert np.all(np.diff(times) >= 0)
+    assert counts.min() >= 0 and counts.max() <= 4 and counts[-1] == 0
+    assert time_average(times, counts) == pytest.approx(result.summary()["L"], rel=0.05)
+
+
+@pytest.mark.parametrize("service, c", [(Deterministic(0.0), 1), (Empirical([0.0, 0.5]), 1), (Empirical([0.0, 1.0]), 3)])
+def test_timeline_with_zero_service_times_never_goes_negative(service, c):
+    times, counts = timeline(simulate_multi(1.0, service, c, 5, 1000, seed=1))
+    assert np.all(np.diff(times) >= 0)
+    assert counts.min() >= 0 and counts.max() <= 5 and counts[-1] == 0
+
+
+def test_timeline_lets_an_arrival_take_the_place_of_a_departure_at_the_same_instant():
+    _, counts = timeline(simulate_multi(Deterministic(1.0), Deterministic(1.0), 1, 1, 100))
+    assert counts.max() == 1 and counts.min() == 0
+
+
+@pytest.mark.parametrize("c, capacity", [(1, inf), (2, 5)])
+def test_simulate_trace_replays_like_simulate_variates(tmp_path, c, capacity):
+    result = simulate_multi(0.9 * c, 1.0, c, capacity, 5000, seed=9)
+    path = str(tmp_path / "trace.npy")
+    np.save(path, np.column_stack((result.arrival_times, result.service_times)))
+    metrics = simulate_trace(path, c, capacity, chunk_size=777)
+    admitted = ~np.isnan(result.time_in_queue)
+    assert metrics["time_in_queue"].mean == pytest.approx(result.time_in_queue[admitted].mean(), abs=1e-9)
+    assert metrics["blocked"].mean == pytest.approx(1 - admitted.mean())
+
+
+def test_simulate_single_does_not_depend_on_the_block_size():
+    whole = simulate_single(0.9, 1.0, 20000, seed=5)
+    blocks = simulate_single(0.9, 1.0, 20000, seed=5, block_size=123)
+    np.testing.assert_array_equal(whole.service_times, blocks.service_times)
+    np.testing.assert_allclose(whole.time_in_queue, blocks.time_in_queue, atol=1e-9)
+
+
+def test_simulate_single_reports_progress_and_cancels_between_blocks():
+    fractions = []
+    simulate_single(0.9, 1.0, 10000, seed=1, block_size=100, progress=lambda done, total: fractions.append(done / total))
+    assert len(fractions) == 300
+    assert np.all(np.diff(fractions) > 0) and fractions[-1] == 1
+
+    cancel = threading.Event()
+
+    def progress(done, total):
+        if done > total // 10:
+            cancel.set()
+
+    with pytest.raises(SimulationCancelled):
+        simulate_single(0.9, 1.0, 10000, block_size=100, progress=progress, cancel=cancel)
+
+
+def test_chart_timeline_keeps_the_full_time_average():
+    result = simulate_single(0.9, 1.0, 100000, seed=8)
+    times, counts, average = chart_timeline(result, buckets=500)
+    assert len(times) <= 4 * 500
+    assert average == pytest.approx(time_average(*timeline(result)))
+
+
+def test_simulate_stream_of_no_customers_reports_zeros(capsys):
+    metrics = simulate_stream(0.8, 1.0, 0, seed=1)
+    assert metrics["time_in_queue"].count == 0
+    output = capsys.readouterr().out
+    assert "Maximum Waiting Time: 0.00" in output and "p99" not in output
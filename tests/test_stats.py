@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from stats import DDSketch, RunningStats, batch_means, confidence_interval, mser, t_quantile
+
+
+def test_t_quantile_approaches_the_normal_and_is_exact_at_one_degree():
+    assert t_quantile(0.975, 1) == pytest.approx(12.7062, rel=1e-4)
+    assert t_quantile(0.975, 10) == pytest.approx(2.2281, rel=1e-3)
+    assert t_quantile(0.975, 1000) == pytest.approx(1.9623, rel=1e-3)
+
+
+def test_confidence_interval_covers_the_mean():
+    samples = np.random.default_rng(4).normal(3, 1, (200, 2))
+    mean, half_width = confidence_interval(samples)
+    assert np.all(np.abs(mean - 3) < half_width)
+
+
+def test_running_stats_merge_matches_numpy():
+    values = np.random.default_rng(3).normal(5, 2, 10001)
+    stats = RunningStats()
+    for chunk in np.array_split(values, 13):
+        stats.update(chunk)
+    other = RunningStats().update(values[:4000]).merge(RunningStats().update(values[4000:]))
+    for accumulated in (stats, other):
+        assert accumulated.count == len(values)
+        assert accumulated.mean == pytest.approx(values.mean(), rel=1e-12)
+        assert accumulated.variance == pytest.approx(values.var(ddof=1), rel=1e-10)
+        assert accumulated.max == values.max()
+
+
+def test_mser_drops_the_warm_up_transient():
+    rng = np.random.default_rng(5)
+    values = rng.normal(0, 1, 5000)
+    values[:500] += np.linspace(20, 0, 500)
+    warmup = mser(values)
+    assert 300 <= warmup <= 1000 and warmup % 5 == 0
+
+
+def test_batch_means_interval_covers_the_mean():
+    mean, half_width = batch_means(np.random.default_rng(6).normal(2, 1, 30000))
+    assert abs(mean - 2) < half_width
+
+
+def test_ddsketch_quantiles_are_within_the_relative_accuracy():
+    values = np.random.default_rng(1).lognormal(0, 2, 100000)
+    values[:5000] = 0
+    sketch = DDSketch(0.01).update(values)
+    ordered = np.sort(values)
+    for q in (0.01, 0.1, 0.5, 0.9, 0.99, 0.999):
+        rank = q * (len(values) - 1)
+        low, high = ordered[int(np.floor(rank))], ordered[int(np.ceil(rank))]
+        estimate = sketch.quantile(q)
+        assert low * (1 - 0.01) - 1e-12 <= estimate <= high * (1 + 0.01) + 1e-12
+
+
+def test_ddsketch_merge_equals_one_sketch_of_everything():
+    rng = np.random.default_rng(2)
+    a, b = rng.exponential(1, 10000), rng.exponential(50, 10000)
+    merged = DDSketch(0.02).update(a).merge(DDSketch(0.02).update(b))
+    whole = DDSketch(0.02).update(np.concatenate((a, b)))
+    q = np.linspace(0, 1, 101)
+    np.testing.assert_array_equal(merged.quantile(q), whole.quantile(q))
+    with pytest.raises(ValueError):
+        merged.merge(DDSketch(0.01))
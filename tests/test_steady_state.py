@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from models import MMC, MMCK
+from simulation import simulate_chunks
+from steady_state import steady_state
+
+
+def test_chunks_continue_one_run():
+    # Servers stay busy across chunk boundaries, so short chunks still give the M/M/c/K waiting time
+    chunks = simulate_chunks(1.8, 1.0, 2, 6, chunk_size=500, seed=2)
+    time_in_queue = np.concatenate([next(chunks)[0] for _ in range(800)])
+    assert len(time_in_queue) == 400000
+    assert np.nanmean(time_in_queue) == pytest.approx(MMCK(1.8, 1.0, 2, 6).findWq(), rel=0.05)
+    assert np.isnan(time_in_queue).mean() == pytest.approx(MMCK(1.8, 1.0, 2, 6).findPk(6), abs=0.005)
+
+
+def test_run_is_extended_until_the_target_half_width():
+    result = steady_state(1.8, 1.0, 2, num_customers=20000, target=0.02, seed=1)
+    assert result.relative_half_width("W") <= 0.02 or result.num_customers >= 10 ** 8
+    assert result.num_customers > 20000
+    low, high = result.interval("W")
+    assert low - 0.1 < MMC(1.8, 1.0, 2).findW() < high + 0.1
+
+
+def test_blocked_customers_are_left_out():
+    result = steady_state(1.8, 1.0, 2, 6, num_customers=400000, seed=3)
+    assert result.means["W"] == pytest.approx(MMCK(1.8, 1.0, 2, 6).findW(), rel=0.03)
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from models import MM1K, MMCK
+from transient import generator, transient
+
+
+def expm_times(p, q, t):
+    """p expm(Q t) for a small dense generator, by scaling and squaring a Taylor series."""
+    a = q * t
+    squarings = max(0, int(np.ceil(np.log2(max(np.abs(a).sum(axis=1).max(), 1e-300)))) + 1)
+    a = a / 2 ** squarings
+    result, term = np.eye(len(a)), np.eye(len(a))
+    for k in range(1, 30):
+        term = term @ a / k
+        result = result + term
+    for _ in range(squarings):
+        result = result @ result
+    return p @ result
+
+
+def dense_generator(lumbda, mu, c, capacity):
+    births, deaths, out = generator(lumbda, mu, c, capacity)
+    return np.diag(births[:-1], 1) + np.diag(deaths[1:], -1) - np.diag(out)
+
+
+@pytest.mark.parametrize("lumbda, c, capacity, initial", [(0.9, 1, 10, 0), (3.0, 2, 15, 15), (8.0, 5, 30, 3)])
+def test_uniformization_matches_the_matrix_exponential(lumbda, c, capacity, initial):
+    times = [0.0, 0.3, 2.0, 7.5]
+    result = transient(lumbda, 1.0, c, capacity, times, initial)
+    p0 = np.zeros(capacity + 1)
+    p0[initial] = 1
+    q = dense_generator(lumbda, 1.0, c, capacity)
+    for t, row in zip(times, result.probabilities):
+        np.testing.assert_allclose(row, expm_times(p0, q, t), atol=1e-10)
+
+
+def test_long_run_reaches_the_steady_state():
+    result = MMCK(4.0, 1.0, 3, 12).transient([500.0])
+    np.testing.assert_allclose(result.probabilities[0], MMCK(4.0, 1.0, 3, 12).distribution(12), atol=1e-10)
+    assert MM1K(0.9, 1.0, 10).transient([500.0]).mean()[0] == pytest.approx(MM1K(0.9, 1.0, 10).findL(), rel=1e-8)
+
+
+def test_constant_rate_function_matches_a_constant_rate():
+    times = np.linspace(0, 10, 11)
+    constant = transient(2.0, 1.0, 2, 20, times)
+    varying = transient(lambda t: 2.0, 1.0, 2, 20, times, max_step=0.25)
+    np.testing.assert_allclose(varying.probabilities, constant.probabilities, atol=1e-10)
+
+
+def test_probabilities_stay_normalized_for_large_capacities():
+    result = transient(1.2, 1.0, 1, 20000, [0.0, 50.0, 200.0])
+    np.testing.assert_allclose(result.probabilities.sum(axis=1), 1, atol=1e-9)
+    assert np.all(np.diff(result.mean()) > 0)
@@ -0,0 +1,143 @@
+from math import log, sqrt
+
+import numpy as np
+
+from models import log_factorials
+
+
+# Poisson terms beyond mean + TAIL_DEVIATIONS standard deviations are dropped by uniformization.
+TAIL_DEVIATIONS = 8
+
+
+class TransientResult:
+    """
+    Holds the probabilities P(n, t) of n customers in the system at each time of a grid.
+    """
+
+    def __init__(self, times, probabilities, numberOfServers):
+        self.times = times
+        # One row per time, one column per state 0..K
+        self.probabilities = probabilities
+        self.numberOfServers = numberOfServers
+
+    def __len__(self):
+        return len(self.times)
+
+    def mean(self):
+        """Returns the mean number of customers in the system L(t) at each time."""
+        return self.probabilities @ np.arange(self.probabilities.shape[1])
+
+    def mean_queue(self):
+        """Returns the mean number of customers waiting Lq(t) at each time."""
+        waiting = np.maximum(np.arange(self.probabilities.shape[1]) - self.numberOfServers, 0)
+        return self.probabilities @ waiting
+
+    def blocking(self):
+        """Returns the probability P(K, t) that the system is full, i.e. that an arrival is blocked, at each time."""
+        return self.probabilities[:, -1]
+
+
+def generator(lumbda, mu, numberOfServers, systemCapacity):
+    """Builds the tridiagonal generator of the M/M/c/K birth-death chain.
+
+    Returns:
+        Tuple[ndarray, ndarray, ndarray]: The birth rates n -> n + 1, the death
+        rates n -> n - 1 and the total rates out of each state n = 0..K; births
+        from K and deaths from 0 are zero.
+    """
+    states = np.arange(systemCapacity + 1)
+    births = np.full(systemCapacity + 1, float(lumbda))
+    births[-1] = 0.0
+    deaths = mu * np.minimum(states, numberOfServers).astype(np.float64)
+    return births, deaths, births + deaths
+
+
+def _uniformize(p, births, deaths, out, dt):
+    """Advances the distribution p by dt with uniformization and returns the new distribution.
+
+    p(t + dt) = sum(Poisson(k; q dt) p P^k) with P = I + Q / q and q the
+    largest rate out of any state. Each product with the tridiagonal P costs
+    O(K), and the Poisson weights are evaluated in log space so q dt can be
+    large; the sum is cut TAIL_DEVIATIONS standard deviations past its mean.
+    """
+    q = float(out.max())
+    a = q * dt
+    if a == 0:
+        return p.copy()
+    births, deaths, out = births / q, deaths / q, out / q
+
+    terms = np.arange(int(a + TAIL_DEVIATIONS * sqrt(a)) + 20)
+    weights = np.exp(-a + terms * log(a) - log_factorials(len(terms) - 1))
+    # Terms before the first weight that does not underflow only advance v
+    first = int(np.argmax(weights > 1e-300))
+
+    v = p.copy()
+    result = weights[0] * v
+    flow = np.empty_like(p)
+    for k in range(1, len(terms)):
+        np.multiply(v, out, out=flow)
+        np.negative(flow, out=flow)
+        flow[1:] += v[:-1] * births[:-1]
+        flow[:-1] += v[1:] * deaths[1:]
+        v += flow
+        if k >= first:
+            result += weights[k] * v
+    return result
+
+
+def transient(lumbda, mu, numberOfServers, systemCapacity, times, initial=0, max_step=None):
+    """Calculates the time-dependent distribution of the number of customers in an M/M/c/K queue.
+
+    The birth-death generator is kept as its three diagonals and the
+    distribution is carried from one grid time to the next with
+    uniformization (see _uniformize), so the cost grows linearly with K and
+    with the total rate times the horizon; K in the tens of thousands is fine.
+
+    lumbda may be a function of time: it is then held at its value at the
+    midpoint of each step, and steps are at most max_step long (by default
+    the spacing of the grid), so a finer max_step follows lambda(t) closer.
+
+    Args:
+        lumbda (float or Callable[[float], float]): Arrival rate, constant or lambda(t).
+        mu (float): Service rate of each server.
+        numberOfServers (int): Number of parallel servers (c).
+        systemCapacity (int): Maximum number of customers in the system (K).
+        times (Sequence[float]): Non-decreasing times, starting at or after 0, to report.
+        initial (int or Sequence[float]): Number of customers at time 0, or their distribution.
+        max_step (float, optional): Longest step over which lambda(t) is held constant.
+
+    Returns:
+        TransientResult: P(n, t) for every time of the grid and n = 0..K.
+    """
+    if numberOfServers <= 0:
+        raise ValueError("Number of servers must be a positive integer.")
+    if systemCapacity <= 0 or systemCapacity == float("inf"):
+        raise ValueError("System capacity must be a positive integer.")
+    times = np.asarray(times, dtype=np.float64)
+    if np.any(np.diff(times) < 0) or (len(times) and times[0] < 0):
+        raise ValueError("Times must be non-negative and non-decreasing.")
+
+    systemCapacity = int(systemCapacity)
+    if np.ndim(initial) == 0:
+        p = np.zeros(systemCapacity + 1)
+        p[int(initial)] = 1.0
+    else:
+        p = np.array(initial, dtype=np.float64)
+        if p.shape != (systemCapacity + 1,):
+            raise ValueError("Initial distribution must have one probability per state 0..K.")
+
+    varying = callable(lumbda)
+    if not varying:
+        chain = generator(lumbda, mu, numberOfServers, systemCapacity)
+
+    probabilities = np.empty((len(times), systemCapacity + 1))
+    now = 0.0
+    for i, target in enumerate(times):
+        while now < target:
+            after = target if max_step is None else min(now + max_step, target)
+            if varying:
+                chain = generator(lumbda((now + after) / 2), mu, numberOfServers, systemCapacity)
+            p = _uniformize(p, *chain, after - now)
+            now = after
+        probabilities[i] = p
+    return TransientResult(times, probabilities, numberOfServers)
@@ -0,0 +1,115 @@
+from math import log
+
+import numpy as np
+
+from models import log_factorials
+
+
+def _log_poisson(x, n):
+    """Returns the log Poisson probabilities of j = 0..n-1 for each mean in x, one row per mean."""
+    j = np.arange(n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(j == 0, 0.0, j * np.log(x)[..., None]) - x[..., None] - log_factorials(n - 1)
+
+
+def _erlang_mixture_tail(x, weights):
+    """Returns sum(weights[k] * P(Erlang(k + 1) > x)) for unit-rate Erlang phases, at each x.
+
+    Uses P(Erlang(k + 1) > x) = sum(pois(j; x), j <= k), so the sum becomes
+    sum(pois(j; x) * sum(weights[k], k >= j)), one matrix product for all x.
+    """
+    tails = np.cumsum(weights[::-1])[::-1]
+    if not len(tails):
+        return np.zeros_like(x)
+    return np.exp(_log_poisson(x, len(tails))) @ tails
+
+
+def waiting_tail(t, lumbda, mu, c, p_wait):
+    """Returns P(Wq > t) of an M/M/c queue with unlimited capacity.
+
+    Waiting customers (probability p_wait, the Erlang C formula) wait an
+    exponential time with rate c mu - lumbda, so P(Wq > t) = p_wait e^-(c mu - lumbda) t.
+    """
+    return p_wait * np.exp(-(c * mu - lumbda) * t)
+
+
+def sojourn_tail(t, lumbda, mu, c, p_wait):
+    """Returns P(W > t) of an M/M/c queue with unlimited capacity.
+
+    W = Wq + S with an exponential service S independent of Wq, so
+    P(W > t) = e^-mu t + p_wait mu (e^-theta t - e^-mu t) / (mu - theta), theta = c mu - lumbda.
+    """
+    theta = c * mu - lumbda
+    if theta == mu:
+        return np.exp(-mu * t) * (1 + p_wait * mu * t)
+    return np.exp(-mu * t) + p_wait * mu * (np.exp(-theta * t) - np.exp(-mu * t)) / (mu - theta)
+
+
+def finite_waiting_tail(t, mu, c, arrivals):
+    """Returns P(Wq > t) of an M/M/c/K queue.
+
+    An admitted customer that finds n >= c customers waits for n - c + 1
+    departures at rate c mu, so P(Wq > t) = sum(pois(j; c mu t) * P(N >= c + j))
+    over j, with N distributed as seen by admitted arrivals.
+
+    Args:
+        t (ndarray): Times to evaluate at.
+        mu (float): Service rate of each server.
+        c (int): Number of servers.
+        arrivals (ndarray): P(N = n) for n = 0..K-1 as seen by admitted arrivals.
+    """
+    return _erlang_mixture_tail(c * mu * t, arrivals[c:])
+
+
+def finite_sojourn_tail(t, mu, c, arrivals):
+    """Returns P(W > t) of an M/M/c/K queue, with arrivals as in finite_waiting_tail.
+
+    With one server, a customer finding n others leaves after n + 1
+    exponential services. With c > 1 servers the service adds
+    P(W > t) = e^-mu t + sum(e^-mu t c^j / (c-1)^(j+1) P(j+1, (c-1) mu t) * P(N >= c + j))
+    to the tail of Wq, where P(j+1, y) is the regularized lower incomplete
+    gamma function, summed in log space from the Poisson tail.
+    """
+    if c == 1:
+        return _erlang_mixture_tail(mu * t, arrivals)
+
+    tails = np.cumsum(arrivals[c:][::-1])[::-1]
+    tail = np.exp(-mu * t)
+    if not len(tails):
+        return tail
+
+    # P(j + 1, y) = sum(pois(i; y), i > j), truncated well past the mean y
+    y = (c - 1) * mu * t
+    terms = max(len(tails) + 1, int(np.max(y, initial=0) + 10 * np.sqrt(np.max(y, initial=0)) + 30))
+    log_upper = np.logaddexp.accumulate(_log_poisson(y, terms)[..., ::-1], axis=-1)[..., ::-1]
+
+    j = np.arange(len(tails))
+    log_terms = (-mu * t)[..., None] + j * log(c) - (j + 1) * log(c - 1) + log_upper[..., 1:len(tails) + 1]
+    return tail + np.exp(log_terms) @ tails
+
+
+def tail_quantile(tail, q, scale):
+    """Returns the smallest t with tail(t) <= 1 - q, elementwise over an array of levels q.
+
+    Brackets every level by doubling from scale (e.g. the mean) and then
+    bisects all levels at once, so tail is evaluated on whole arrays. Levels
+    covered by the atom at t = 0 give 0, and q >= 1 gives inf.
+    """
+    q = np.asarray(q, dtype=np.float64)
+    target = 1 - q
+    low = np.zeros_like(q)
+    high = np.full_like(q, scale)
+    reachable = q < 1
+
+    for _ in range(64):
+        above = reachable & (tail(high) > target)
+        if not above.any():
+            break
+        high = np.where(above, 2 * high, high)
+    for _ in range(64):
+        middle = (low + high) / 2
+        above = tail(middle) > target
+        low = np.where(above, middle, low)
+        high = np.where(above, high, middle)
+
+    return np.where(~reachable, np.inf, np.where(tail(np.zeros_like(q)) <= target, 0.0, high))